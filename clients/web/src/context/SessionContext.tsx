@@ -9,7 +9,10 @@ export type ApiResponse = {
   similarity: number;
   metrics: Record<string, number>;
   advice: string[];
-  reference_audio_url: string;
+  reference_audio_url: string | null;    // null while the styled clone is still rendering
+  clone_job_id?: string | null;
+  clone_status_url?: string | null;       // poll until status is "done"
+  clone_events_url?: string | null;
 };
 
 /* ------------------------------------------------------------------ */
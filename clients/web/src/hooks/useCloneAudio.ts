@@ -0,0 +1,37 @@
+import { useQuery } from "@tanstack/react-query";
+import type { ApiResponse } from "../context/SessionContext";
+
+type CloneJob = {
+  status: "queued" | "running" | "done" | "failed" | "cancelled";
+  stage: string;
+  progress: number;
+  error: string | null;
+  result: { reference_audio_url: string } | null;
+};
+
+const TERMINAL = ["done", "failed", "cancelled"];
+
+/** Styled-clone URL: given directly, or polled from the deferred clone job. */
+export function useCloneAudio(response: ApiResponse | null) {
+  const statusUrl = response?.reference_audio_url ? null : response?.clone_status_url;
+
+  const job = useQuery<CloneJob, Error>({
+    queryKey: ["clone-job", statusUrl],
+    enabled: !!statusUrl,
+    queryFn: async () => {
+      const res = await fetch(import.meta.env.VITE_API_URL + statusUrl);
+      if (!res.ok) throw new Error(await res.text());
+      return (await res.json()) as CloneJob;
+    },
+    refetchInterval: (query) =>
+      TERMINAL.includes(query.state.data?.status ?? "") ? false : 1000,
+  });
+
+  const url =
+    response?.reference_audio_url ?? job.data?.result?.reference_audio_url ?? null;
+  const failed =
+    job.isError ||
+    (!!job.data && job.data.status !== "done" && TERMINAL.includes(job.data.status)) ||
+    (!url && !statusUrl);               // clone queue was full – no job to wait for
+  return { url, failed, stage: job.data?.stage ?? "queued", progress: job.data?.progress ?? 0 };
+}
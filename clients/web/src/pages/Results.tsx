@@ -3,10 +3,12 @@ import { useNavigate } from "react-router-dom";
 import { SessionContext } from "../context/SessionContext";
 import AudioPlayer from "../components/AudioPlayer";
 import RadarChart from "../components/RadarChart";
+import { useCloneAudio } from "../hooks/useCloneAudio";
 
 export default function Results() {
   const nav = useNavigate();
   const { response } = useContext(SessionContext);
+  const clone = useCloneAudio(response);
 
   if (!response) {
     nav("/", { replace: true });
@@ -19,16 +21,27 @@ export default function Results() {
 
       <RadarChart metrics={response.metrics} />
 
-      <div className="flex flex-col md:flex-row gap-6">
-        <div>
-          <h2 className="text-lg font-medium mb-2">Your original</h2>
-          <AudioPlayer src={response.reference_audio_url.replace("styled", "original")} />
+      {clone.url ? (
+        <div className="flex flex-col md:flex-row gap-6">
+          <div>
+            <h2 className="text-lg font-medium mb-2">Your original</h2>
+            <AudioPlayer src={clone.url.replace("styled", "original")} />
+          </div>
+          <div>
+            <h2 className="text-lg font-medium mb-2">Styled clone</h2>
+            <AudioPlayer src={clone.url} />
+          </div>
         </div>
-        <div>
-          <h2 className="text-lg font-medium mb-2">Styled clone</h2>
-          <AudioPlayer src={response.reference_audio_url} />
+      ) : clone.failed ? (
+        <p className="text-gray-500">The styled clone isn't available for this take.</p>
+      ) : (
+        <div className="flex items-center gap-3">
+          <div className="animate-spin h-6 w-6 border-4 border-primary border-t-transparent rounded-full" />
+          <p>
+            Generating your styled clone… ({clone.stage}, {Math.round(clone.progress * 100)}%)
+          </p>
         </div>
-      </div>
+      )}
 
       <div className="max-w-md">
         <h2 className="text-lg font-medium mb-2">Improvement tips</h2>
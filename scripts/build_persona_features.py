@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+"""
+build_persona_features.py
+-------------------------
+Precompute the persona feature store (cleaned audio, WhisperX segments and
+prosody + language metrics) so /analyze only has to analyse the user clip.
+
+    python scripts/build_persona_features.py            # only missing / stale
+    python scripts/build_persona_features.py --force    # rebuild everything
+"""
+
+from __future__ import annotations
+import argparse, sys, pathlib
+
+BACKEND = pathlib.Path(__file__).resolve().parent.parent / "services" / "backend"
+sys.path.insert(0, str(BACKEND))
+
+from app.config import PERSONA_DIR                                  # noqa: E402
+from app.speech_compare import persona_features                      # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the persona feature store.")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild even if a fresh record already exists.")
+    args = parser.parse_args(argv)
+
+    print(f"{PERSONA_DIR} → {persona_features.store_dir()}")
+    for wav_path in sorted(PERSONA_DIR.glob("*.wav")):
+        pid = wav_path.stem
+        if not args.force and persona_features.load(pid, wav_path) is not None:
+            print(f"⏭️  {pid}: up to date")
+            continue
+        persona_features.build(pid, wav_path)
+        print(f"✅ {pid}")
+
+if __name__ == "__main__":
+    main()
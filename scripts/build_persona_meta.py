@@ -1,30 +1,50 @@
-from resemblyzer import VoiceEncoder, preprocess_wav
-import parselmouth, librosa, json, pathlib, numpy as np
+#!/usr/bin/env python
+"""
+build_persona_meta.py
+---------------------
+Rebuild the persona embedding store (voice embedding + mean pitch / wpm per
+persona) from services/backend/data/personas/*.wav.
 
-root = pathlib.Path(__file__).parent.parent / "services" / "backend" / "data" / "personas"
-out  = pathlib.Path(__file__).parent.parent / "services" / "backend" / "data" / "embeddings"
-out.mkdir(parents=True, exist_ok=True)
+Only new or changed WAVs are re-encoded (see app/ml/persona_catalog.py);
+the result is swapped in atomically, so a running API reloads it by itself.
 
-print(root)
-encoder = VoiceEncoder()
-meta = {}
+    python scripts/build_persona_meta.py                 # incremental
+    python scripts/build_persona_meta.py --workers 4
+    python scripts/build_persona_meta.py --force --json  # everything, plus legacy JSON
+"""
 
-for wav_path in root.glob("*.wav"):
-    print(wav_path)
-    pid = wav_path.stem.lower()          # e.g. mrbeast.wav → mrbeast
-    wav = preprocess_wav(wav_path)
-    embed = encoder.embed_utterance(wav).tolist()
+from __future__ import annotations
+import argparse, json, sys, pathlib
 
-    snd = parselmouth.Sound(str(wav_path))
-    pitch = snd.to_pitch()
-    mean_pitch = float(pitch.selected_array['frequency'][pitch.selected_array['frequency']>0].mean())
+BACKEND = pathlib.Path(__file__).resolve().parent.parent / "services" / "backend"
+sys.path.insert(0, str(BACKEND))
 
-    duration = snd.get_total_duration()
-    words = len(librosa.effects.split(librosa.load(wav_path, sr=16000)[0]))
-    wpm = words / (duration/60)
+from app.config import PERSONA_DIR                                  # noqa: E402
+from app.ml.persona_catalog import build_catalog                     # noqa: E402
+from app.ml.persona_store import META_JSON, open_store               # noqa: E402
+from app.ml.style import PERSONA_DIR as EMBEDDING_DIR                # noqa: E402
 
-    meta[pid] = {"embedding": embed,
-                 "prosody": {"mean_pitch": mean_pitch, "wpm": wpm}}
 
-(out / "personas_meta.json").write_text(json.dumps(meta, indent=2))
-print("✅ personas_meta.json rebuilt")
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the persona embedding store.")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="encoder processes (one VoiceEncoder each)")
+    parser.add_argument("--force", action="store_true",
+                        help="re-encode every persona, even if unchanged")
+    parser.add_argument("--json", action="store_true",
+                        help=f"also write the legacy {META_JSON}")
+    args = parser.parse_args(argv)
+
+    print(f"{PERSONA_DIR} → {EMBEDDING_DIR}")
+    gen = build_catalog(PERSONA_DIR, EMBEDDING_DIR, workers=args.workers, force=args.force)
+    print(f"✅ persona store rebuilt: {gen}" if gen else "⏭️  persona store up to date")
+
+    if args.json:
+        store = open_store(EMBEDDING_DIR)
+        meta = {pid: {"embedding": emb.tolist(), "prosody": pros}
+                for pid in store.ids for emb, pros in [store.get(pid)]}
+        (EMBEDDING_DIR / META_JSON).write_text(json.dumps(meta))
+        print(f"✅ {META_JSON} rebuilt")
+
+if __name__ == "__main__":
+    main()
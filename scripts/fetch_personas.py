@@ -4,15 +4,35 @@ fetch_personas.py
 -----------------
 Download 30-second WAV clips for each persona.
 
+Personas are fetched concurrently (--workers) and only the needed time
+range is transferred:
+  • YouTube & co. → `yt-dlp --download-sections`, then ffmpeg → 16 kHz mono
+  • local files, file:// URLs and direct media URLs (…/clip.mp3 on any
+    HTTP server) → ffmpeg seeks the input itself, no yt-dlp involved
+A "url" without a scheme is a local path and must exist; anything else
+("example.com/talk.mp3") is rejected – spell out http(s):// for the web.
+Clips that already exist as a valid 16 kHz mono WAV of the right length
+are skipped (--force re-fetches).  A per-persona timing table is printed
+at the end.
+
+Offline check against a local stand-in (services/backend/tests/test_fetch_personas.py
+does the same; http.server ignores Range requests, so this also covers the
+read-from-the-top fallback):
+  python -m http.server -d ~/media 8000 &
+  echo '[{"id": "test", "url": "http://127.0.0.1:8000/talk.mp3", "start": "00:00:05"}]' > m.json
+  python scripts/fetch_personas.py --manifest m.json --out /tmp/personas
+
 Prereqs (install once):
   pip install yt-dlp
   # ffmpeg must be on PATH
 """
 
 from __future__ import annotations
-import argparse, json, subprocess, sys, tempfile
+import argparse, json, os, subprocess, sys, tempfile, time, wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict
+from urllib.parse import urlparse
 
 # --------------------------------------------------------------------------- #
 # 1️⃣  Persona catalogue – edit or load via --manifest
@@ -43,51 +63,154 @@ PERSONAS: List[Dict[str, str]] = [
 # --------------------------------------------------------------------------- #
 # 2️⃣  Helpers
 # --------------------------------------------------------------------------- #
+SAMPLE_RATE = 16000
+MEDIA_EXTS  = {".wav", ".mp3", ".m4a", ".aac", ".flac", ".ogg", ".opus", ".webm", ".mp4", ".mkv"}
+
 def run(cmd: list[str]) -> None:
     """Run a subprocess, raise if non-zero."""
     subprocess.run(cmd, check=True, text=True)
 
+def seconds(ts: str | int | float) -> float:
+    """'HH:MM:SS[.ms]' / 'MM:SS' / seconds → seconds."""
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    total = 0.0
+    for part in ts.split(":"):
+        total = total * 60 + float(part)
+    return total
+
+def is_direct(url: str) -> bool:
+    """Local file or plain media URL – ffmpeg can seek it without yt-dlp."""
+    parsed = urlparse(url)
+    if parsed.scheme in ("", "file"):
+        return True
+    return parsed.scheme in ("http", "https") and Path(parsed.path).suffix.lower() in MEDIA_EXTS
+
+def local_path(url: str) -> Path:
+    """Filesystem path of a file:// URL or a scheme-less entry, which must exist."""
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return Path(parsed.path)
+    path = Path(url).expanduser()
+    if not path.is_file():
+        raise ValueError(f"{url!r} has no scheme and is not a local file "
+                         "(use http(s)://… for remote media)")
+    return path
+
+def is_valid_clip(path: Path, duration: float, tolerance: float = 0.5) -> bool:
+    """Existing WAV is 16 kHz mono 16-bit and (about) `duration` seconds long."""
+    try:
+        with wave.open(str(path), "rb") as w:
+            return (w.getframerate() == SAMPLE_RATE and w.getnchannels() == 1
+                    and w.getsampwidth() == 2
+                    and w.getnframes() / SAMPLE_RATE >= duration - tolerance)
+    except (OSError, EOFError, wave.Error):
+        return False
+
+def to_wav(src: str, dest: Path, start: float | None, duration: float) -> None:
+    """ffmpeg: [seek], trim, mono, 16 kHz; written to .part and renamed."""
+    part = dest.with_name(dest.name + ".part")
+    seek = ["-ss", str(start)] if start is not None else []
+    window = [*seek, "-t", str(duration)]
+    try:
+        _ffmpeg(src, part, before=window)    # input seeking (HTTP range requests)
+        if (start and urlparse(src).scheme in ("http", "https")
+                and not is_valid_clip(part, duration)):
+            # the server ignored the Range request (python -m http.server does) and
+            # ffmpeg still exits 0 – decode from the top and drop the lead-in instead
+            _ffmpeg(src, part, after=window)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    os.replace(part, dest)
+
+def _ffmpeg(src: str, part: Path, before: list[str] | None = None,
+            after: list[str] | None = None) -> None:
+    run([
+        "ffmpeg",
+        "-hide_banner", "-loglevel", "error",
+        *(before or []),
+        "-i", src,
+        *(after or []),
+        "-ac", "1",
+        "-ar", str(SAMPLE_RATE),
+        "-vn",  # no video
+        "-f", "wav",
+        "-y",   # overwrite
+        str(part),
+    ])
+
 def download_and_convert(id_: str, url: str, start: str,
-                         duration: int, out_dir: Path) -> None:
+                         duration: int, out_dir: Path, force: bool = False) -> Dict:
+    """Fetch one persona clip; returns its timing row."""
     out_dir.mkdir(parents=True, exist_ok=True)
-    tmp_dir = Path(tempfile.mkdtemp())
-    try:
-        m4a_path = tmp_dir / f"{id_}.m4a"
-
-        # yt-dlp: best audio-only
-        print(f"➡️  {id_}: downloading audio …")
-        run([
-            "yt-dlp",
-            "--quiet",
-            "--extract-audio",
-            "--audio-format", "m4a",
-            "--audio-quality", "0",
-            "--output", str(m4a_path),
-            url,
-        ])
-
-        wav_path = out_dir / f"{id_}.wav"
+    wav_path = out_dir / f"{id_}.wav"
+    row = {"id": id_, "status": "skipped", "download_s": 0.0, "convert_s": 0.0}
+    t0 = time.perf_counter()
+    if not force and is_valid_clip(wav_path, duration):
+        print(f"⏭️  {id_}: already present")
+        return row | {"total_s": time.perf_counter() - t0}
+
+    begin = seconds(start)
+    if is_direct(url):
+        src = url if urlparse(url).scheme in ("http", "https") else str(local_path(url))
         print(f"🎧  {id_}: trimming & converting → WAV …")
+        to_wav(src, wav_path, begin, duration)
+        row["convert_s"] = time.perf_counter() - t0
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            # yt-dlp: best audio-only, just the [start, start + duration] section
+            print(f"➡️  {id_}: downloading {duration}s section …")
+            run([
+                "yt-dlp",
+                "--quiet",
+                "--extract-audio",
+                "--audio-format", "m4a",
+                "--audio-quality", "0",
+                "--download-sections", f"*{begin}-{begin + duration}",
+                "--force-keyframes-at-cuts",
+                "--output", str(Path(tmp) / f"{id_}.%(ext)s"),
+                url,
+            ])
+            row["download_s"] = time.perf_counter() - t0
+            section = next(Path(tmp).glob(f"{id_}.*"))
+
+            print(f"🎧  {id_}: converting → WAV …")
+            t1 = time.perf_counter()
+            to_wav(str(section), wav_path, None, duration)
+            row["convert_s"] = time.perf_counter() - t1
+    print(f"✅  {id_} saved to {wav_path}")
+    return row | {"status": "fetched", "total_s": time.perf_counter() - t0}
 
-        # ffmpeg: trim, mono, 16 kHz, WAV
-        run([
-            "ffmpeg",
-            "-hide_banner", "-loglevel", "error",
-            "-ss", start,
-            "-t", str(duration),
-            "-i", str(m4a_path),
-            "-ac", "1",
-            "-ar", "16000",
-            "-vn",  # no video
-            "-y",   # overwrite
-            str(wav_path),
-        ])
-        print(f"✅  {id_} saved to {wav_path}\n")
-    finally:
-        # clean temp files
-        for p in tmp_dir.glob("*"):
-            p.unlink(missing_ok=True)
-        tmp_dir.rmdir()
+def fetch_all(personas: List[Dict[str, str]], out_dir: Path, duration: int = 30,
+              workers: int = 4, force: bool = False) -> List[Dict]:
+    """Fetch every persona on a bounded thread pool (the work is in subprocesses)."""
+    rows: List[Dict] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(download_and_convert,
+                        id_=p["id"], url=p["url"], start=p.get("start", "00:00:00"),
+                        duration=duration, out_dir=out_dir, force=force): p["id"]
+            for p in personas
+        }
+        for fut in as_completed(futures):
+            try:
+                rows.append(fut.result())
+            except (subprocess.CalledProcessError, OSError, StopIteration, ValueError) as exc:
+                print(f"⚠️  {futures[fut]} failed: {exc}", file=sys.stderr)
+                rows.append({"id": futures[fut], "status": "failed", "error": str(exc)})
+    order = {p["id"]: i for i, p in enumerate(personas)}
+    return sorted(rows, key=lambda r: order[r["id"]])
+
+def print_summary(rows: List[Dict], wall_s: float) -> None:
+    print(f"\n{'persona':<20} {'status':<8} {'download':>9} {'convert':>8} {'total':>7}")
+    for r in rows:
+        if r["status"] == "failed":
+            print(f"{r['id']:<20} {'failed':<8} {r['error']}")
+            continue
+        print(f"{r['id']:<20} {r['status']:<8} {r['download_s']:>8.1f}s "
+              f"{r['convert_s']:>7.1f}s {r['total_s']:>6.1f}s")
+    print(f"{len(rows)} personas in {wall_s:.1f}s wall time")
 
 # --------------------------------------------------------------------------- #
 # 3️⃣  CLI
@@ -103,25 +226,29 @@ def main(argv: List[str] | None = None) -> None:
         "--duration", type=int, default=30,
         help="Clip length in seconds (default: 30)."
     )
+    parser.add_argument(
+        "--workers", type=int, default=4,
+        help="Personas fetched concurrently (default: 4)."
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Re-fetch clips that are already present and valid."
+    )
+    parser.add_argument(
+        "--out", type=Path,
+        default=Path(__file__).resolve().parents[2] / "speech-master" / "data" / "personas",
+        help="Output directory for the WAV clips."
+    )
     args = parser.parse_args(argv)
 
     personas = PERSONAS
     if args.manifest:
         personas = json.loads(args.manifest.read_text())
 
-    out_dir = Path(__file__).resolve().parents[2] / "speech-master" / "data" / "personas"
-
-    for p in personas:
-        try:
-            download_and_convert(
-                id_=p["id"],
-                url=p["url"],
-                start=p.get("start", "00:00:00"),
-                duration=args.duration,
-                out_dir=out_dir,
-            )
-        except subprocess.CalledProcessError as exc:
-            print(f"⚠️  {p['id']} failed: {exc}", file=sys.stderr)
+    t0 = time.perf_counter()
+    rows = fetch_all(personas, args.out, duration=args.duration,
+                     workers=args.workers, force=args.force)
+    print_summary(rows, time.perf_counter() - t0)
 
 if __name__ == "__main__":
     main()
@@ -22,6 +22,10 @@ import parselmouth.praat as praat
 import librosa
 import soundfile as sf
 
+BACKEND = pathlib.Path(__file__).resolve().parent.parent / "services" / "backend"
+sys.path.insert(0, str(BACKEND))
+from app.speech_compare.acoustics import Acoustics, PITCH_FLOOR   # noqa: E402
+
 try:
     import torch
     import torchaudio
@@ -156,16 +160,17 @@ def clean_audio_whisper_style(audio_path, output_path):
         return False
 
 # ─── Voice Quality Metrics ────────────────────────────────────────────────
-def voice_metrics(sound, pp):
-    """Return key voice-quality numbers as dict."""
+def voice_metrics(ac: Acoustics):
+    """Return key voice-quality numbers as dict (same definitions as the API)."""
+    sound = ac.sound
     try:
-        jitter = praat.call(pp, "Get jitter (local)", 0, 0, 0.0001, 0.02, 1.3)
-        shimmer = praat.call([sound, pp], "Get shimmer (local)", 0, 0, 0.0001, 0.02, 1.3, 1.6)
-        hnr = sound.to_harmonicity().values.mean()
+        jitter = ac.jitter_local()
+        shimmer = ac.shimmer_local()
+        hnr = ac.hnr_db()
         
         # CPP calculation with error handling
         try:
-            power_cepstrum = praat.call(sound, "To PowerCepstrum", 75, 0.002)
+            power_cepstrum = praat.call(sound, "To PowerCepstrum", PITCH_FLOOR, 0.002)
             cpp = praat.call(power_cepstrum, "Get peak prominence", 60, 333.3, "Parabolic", 0.001, 0.05, "Straight", "Robust")
         except:
             try:
@@ -188,19 +193,19 @@ def generate_prosody_chart(audio_path: pathlib.Path, out_dir: pathlib.Path, titl
     """Generate prosody visualization from audio file."""
     try:
         snd = parselmouth.Sound(str(audio_path))
-        dur = snd.get_total_duration()
+        ac = Acoustics(snd)                  # pitch / point process shared with the metrics
+        dur = ac.duration_s
         
         print(f"Analyzing audio: {dur:.2f} seconds")
         
         # Extract prosodic features
-        pitch = snd.to_pitch(time_step=0.01, pitch_floor=75, pitch_ceiling=500)
-        intensity_obj = snd.to_intensity(time_step=0.01)
+        pitch = ac.pitch
+        intensity_obj = ac.intensity
         specgram = snd.to_spectrogram(window_length=0.03, maximum_frequency=8000)
         
         # Get voice quality metrics
         try:
-            pp = praat.call(snd, "To PointProcess (periodic, cc)", 75, 500)
-            metrics = voice_metrics(snd, pp)
+            metrics = voice_metrics(ac)
         except:
             print("Warning: Could not calculate voice metrics")
             metrics = dict(jitter_pct=np.nan, shimmer_pct=np.nan, HNR_dB=np.nan, CPP_dB=np.nan)
@@ -1,60 +1,111 @@
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException, Form
-from fastapi.responses import JSONResponse
-import shutil
+from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException, Form, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import uuid, tempfile, asyncio
+import uuid, tempfile, asyncio, json, os, functools, time
 from app.ml import stt, style, tts
+from app.ml.persona_index import get_index
 from app.utils import storage, scoring
 from app.config import *
-from app.speech_compare.ingest import preprocess
-from app.speech_compare.analysis_pipeline import run_pipeline
+from app.speech_compare.ingest import stream_upload, Upload, UploadRejected
+from app.utils.audio import AudioBuffer
+from app.speech_compare.analysis_pipeline import run_pipeline, cache_key
+from app.speech_compare.transcribe import fingerprint
+from app.speech_compare.live import LiveCoach
+from app.utils.cache import result_cache
+from app.utils.jobs import JobQueue, JobQueueFull, JobNotOwned
+from app.utils.metrics import metrics as _metrics
+import numpy as np
 router = APIRouter()
 
+WAV_TYPES = ("audio/wav", "audio/wave", "audio/x-wav")
+
 class AnalysisResponse(BaseModel):
     transcript: str
     similarity: float
     metrics: dict[str, float]
     advice: list[str]
-    reference_audio_url: str
+    closest_personas: list[dict] = []           # [{"persona_id", "similarity"}], best first
+    reference_audio_url: str | None = None      # set on the clone job once it finishes
+    clone_job_id: str | None = None             # None when the clone queue was full
+    clone_status_url: str | None = None
+    clone_events_url: str | None = None
+
+# XTTS gets its own small queue: a burst of clones cannot delay analyses,
+# and clones for interactive users (priority 0) go ahead of bulk ones.
+clone_jobs = JobQueue(workers=CLONE_WORKERS, maxsize=CLONE_QUEUE_SIZE,
+                      db_path=JOB_DB, name="clone")
+
+
+def _clone_job(transcript: str, user_wav: str, persona_id: str, audio_sha256: str,
+               progress=None) -> dict:
+    progress = progress or (lambda stage, fraction=None: None)
+    progress("synthesizing", 0.1)                 # cancellation points: before each step
+    cloned = tts.clone(text=transcript,
+                       user_wav=user_wav,
+                       persona_style=persona_id,
+                       audio_sha256=audio_sha256)
+    progress("uploading", 0.9)
+    url = storage.upload_bytes(
+        data=cloned,
+        blob_name=f"data/clones/{uuid.uuid4()}.wav",
+        content_type="audio/wav",
+    )
+    return {"reference_audio_url": url}
+
 
 @router.post("/analyze_and_clone", response_model=AnalysisResponse)
 async def analyze_and_clone(
     persona_id: str,
     background_tasks: BackgroundTasks,
     audio: UploadFile = File(...),
+    clone_priority: int = 0,
 ):
-    if audio.content_type not in ("audio/wav", "audio/wave", "audio/x-wav"):
+    """
+    Analysis comes back right away; the voice clone is queued as a job.
+    Poll `clone_status_url` (or stream `clone_events_url`) for its
+    `result.reference_audio_url`; DELETE /jobs/{clone_job_id} cancels it.
+    Lower `clone_priority` runs first.
+    """
+    if audio.content_type not in WAV_TYPES:
         raise HTTPException(400, f"Please upload a WAV file. Curr file: {audio.content_type} ")
 
-    # ---- 1. Save raw upload locally ----
-    tmp_path = tempfile.NamedTemporaryFile(delete=False, suffix=".wav").name
-    with open(tmp_path, "wb") as f:
-        f.write(await audio.read())
+    # ---- 1. Stream raw upload to disk (header/size/duration checked as it arrives) ----
+    fd, tmp_path = tempfile.mkstemp(suffix=".wav"); os.close(fd)
+    upload = await _receive(audio, Path(tmp_path), require_wav=True)
 
-    # ---- 2. Transcribe ----
-    transcript = stt.transcribe(tmp_path)
+    # ---- 2. Transcribe (memoised on the audio hash) ----
+    key = result_cache.key(upload.sha256, stage="analyze_and_clone", transcriber=fingerprint())
+    decoded = functools.cache(lambda: AudioBuffer.from_file(tmp_path))   # only on a miss, once
 
     # ---- 3. Style metrics ----
-    user_vec, user_prosody = style.extract(tmp_path)
+    def extract():
+        vec, prosody = style.extract(decoded())
+        return {"embedding": vec.tolist(), "prosody": prosody}
+
+    def analyse():
+        transcript = result_cache.memo_json(key, "transcript", lambda: stt.transcribe(decoded()))
+        return transcript, result_cache.memo_json(key, "style", extract)
+
+    transcript, user_style = await run_in_threadpool(analyse)
+    user_vec, user_prosody = np.array(user_style["embedding"]), user_style["prosody"]
     persona_vec, persona_prosody = style.load_persona(persona_id)
     sim, metrics = scoring.compare(user_vec, user_prosody,
                                    persona_vec, persona_prosody)
 
     advice = scoring.generate_tips(metrics)
+    closest = [{"persona_id": pid, "similarity": round(score * 100, 1)}
+               for pid, score in get_index().top_k(user_vec, k=5)]
 
-    # ---- 4. Voice clone in background ----
-    async def clone_and_upload():
-        cloned = tts.clone(text=transcript,
-                           user_wav=tmp_path,
-                           persona_style=persona_id)
-        url = storage.upload_bytes(
-            data=cloned,
-            blob_name=f"data/clones/{uuid.uuid4()}.wav",
-            content_type="audio/wav",
-        )
-        return url
-
-    reference_audio_url = await clone_and_upload()
+    # ---- 4. Voice clone as a deferred job ----
+    try:
+        clone = clone_jobs.submit(_clone_job, transcript, tmp_path, persona_id, upload.sha256,
+                                  kind="clone", priority=clone_priority)
+        clone_links = {"clone_job_id": clone.id,
+                       "clone_status_url": f"/jobs/{clone.id}",
+                       "clone_events_url": f"/jobs/{clone.id}/events"}
+    except JobQueueFull:
+        clone_links = {}                          # analysis is still worth returning
 
     # ---- 5. Upload raw clip (optional log) ----
     background_tasks.add_task(
@@ -66,10 +117,90 @@ async def analyze_and_clone(
         similarity=round(sim * 100, 1),
         metrics=metrics,
         advice=advice,
-        reference_audio_url=reference_audio_url,
+        closest_personas=closest,
+        **clone_links,
     )
 
 
+@router.post("/clone/stream", summary="Stream a voice clone while it is being synthesized")
+async def clone_stream(
+    persona_id: str,
+    audio: UploadFile = File(...),
+    text: str | None = Form(None),
+):
+    """
+    Chunked `audio/wav` response: a header, then PCM as XTTS produces it.
+    Without `text` the upload's own transcript is spoken.  Time-to-first-audio
+    is recorded as `tts.ttfa_ms` on GET /metrics.
+    """
+    t0 = time.perf_counter()
+    if audio.content_type not in WAV_TYPES:
+        raise HTTPException(400, f"Please upload a WAV file. Curr file: {audio.content_type} ")
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".wav"); os.close(fd)
+    try:
+        upload = await _receive(audio, Path(tmp_path), require_wav=True)
+        if not text:
+            text = await run_in_threadpool(stt.transcribe, Path(tmp_path))
+    except BaseException:                           # body() below never runs to clean up
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+    def body():
+        # sync generator → Starlette iterates it in the threadpool, off the event loop
+        try:
+            for i, chunk in enumerate(tts.clone_stream(text, tmp_path, persona_style=persona_id,
+                                                       audio_sha256=upload.sha256)):
+                if i == 1:                                  # chunk 0 is the WAV header
+                    _metrics.observe("tts.ttfa_ms", (time.perf_counter() - t0) * 1000)
+                yield chunk
+            _metrics.observe("tts.stream_total_ms", (time.perf_counter() - t0) * 1000)
+        finally:
+            os.unlink(tmp_path)
+
+    return StreamingResponse(body(), media_type="audio/wav")
+
+
+def _analyze_job(user_path: Path, audio_sha256: str, persona_path: Path, coach: str,
+                 run_id: str, progress=None) -> dict:
+    """Blocking part of /analyze – runs on a worker thread, never on the event loop."""
+    progress = progress or (lambda stage, fraction=None: None)
+
+    # Clean → analyse → report, all in memory (persona features come from the
+    # store); repeated uploads of the same clip reuse the cached metrics
+    report_file = run_pipeline(user_path, persona_path, coach_name=coach, run_id=run_id,
+                               cache_key=cache_key(audio_sha256), progress=progress,
+                               preprocess_user=True)
+
+    # FastAPI StaticFiles serves it
+    return {"report_url": f"/reports/{report_file.name}"}
+
+
+async def _receive(audio: UploadFile, dest: Path, require_wav: bool, **limits) -> Upload:
+    try:
+        return await stream_upload(audio, dest, require_wav=require_wav, **limits)
+    except UploadRejected as err:
+        raise HTTPException(status_code=err.status_code, detail=str(err)) from err
+
+
+async def _save_upload(persona_id: str, user_audio: UploadFile, run_id: str) -> tuple[Upload, Path]:
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    suffix       = Path(user_audio.filename or "").suffix
+    user_path    = DATA_DIR / f"user_{run_id}{suffix}"
+    persona_path = PERSONA_DIR / f"{persona_id}.wav"
+
+    if not persona_path.exists():
+        raise HTTPException(status_code=404, detail=f"Unknown persona '{persona_id}'")
+
+    # other formats are decoded by pydub later; WAVs are validated up front.
+    # run_pipeline streams long recordings, so the long-form limits apply here
+    is_wav = suffix.lower() == ".wav" or user_audio.content_type in WAV_TYPES
+    upload = await _receive(user_audio, user_path, require_wav=is_wav,
+                            max_bytes=LONGFORM_MAX_UPLOAD_MB * 2**20,
+                            max_duration_s=LONGFORM_MAX_UPLOAD_S)
+    return upload, persona_path
+
+
 @router.post("/analyze", summary="Compare two speech samples and get a coaching report")
 async def analyze(
     persona_id: str = 'morganfreeman',
@@ -78,23 +209,123 @@ async def analyze(
 ):
     run_id = uuid.uuid4().hex
     try:
-        # 1. Persist the uploads
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        user_path    = DATA_DIR / f"user_{run_id}{Path(user_audio.filename).suffix}"
-        persona_path = PERSONA_DIR / f"{persona_id}.wav"
+        upload, persona_path = await _save_upload(persona_id, user_audio, run_id)
+        result = await run_in_threadpool(_analyze_job, upload.path, upload.sha256,
+                                         persona_path, coach, run_id)
+        return JSONResponse(result)
 
-        with user_path.open("wb") as f:       shutil.copyfileobj(user_audio.file, f)
-        # with persona_path.open("wb") as f:    shutil.copyfileobj(persona_audio.file, f)
+    except HTTPException:
+        raise
+    except Exception as err:
+        raise HTTPException(status_code=500, detail=str(err)) from err
 
-        # 2. Clean → analyse → report
-        user_clean    = preprocess(user_path)
-        persona_clean = preprocess(persona_path)
-        report_file   = run_pipeline(user_clean, persona_clean, coach_name=coach, run_id=run_id)
 
-        # 3. Return URL (FastAPI StaticFiles serves it)
-        return JSONResponse({"report_url": f"/reports/{report_file.name}"})
+# ---------------------------------------------------------------------------
+# Async jobs: submit → poll /jobs/{id} or stream /jobs/{id}/events
+# ---------------------------------------------------------------------------
+analysis_jobs = JobQueue(workers=JOB_WORKERS, maxsize=JOB_QUEUE_SIZE,
+                         db_path=JOB_DB, name="analyze")
 
-    except Exception as err:
-        raise HTTPException(status_code=500, detail=str(err)) from err
+
+@router.post("/jobs/analyze", status_code=202, summary="Queue an analysis and return its job id")
+async def submit_analyze(
+    persona_id: str = 'morganfreeman',
+    user_audio: UploadFile = File(...),
+    coach: str = Form("openai"),
+):
+    run_id = uuid.uuid4().hex
+    upload, persona_path = await _save_upload(persona_id, user_audio, run_id)
+    try:
+        job = analysis_jobs.submit(_analyze_job, upload.path, upload.sha256, persona_path,
+                                   coach, run_id, kind="analyze")
+    except JobQueueFull as err:
+        upload.path.unlink(missing_ok=True)
+        raise HTTPException(status_code=503, detail=str(err), headers={"Retry-After": "5"})
+    return {"job_id": job.id,
+            "status_url": f"/jobs/{job.id}",
+            "events_url": f"/jobs/{job.id}/events"}
 
 
+def _find_job(job_id: str) -> JobQueue:
+    queues = {"analyze": analysis_jobs, "clone": clone_jobs}
+    for jobs in queues.values():
+        snap = jobs.get(job_id)
+        if snap is not None:                    # with JOB_DB both queues see every row
+            return queues.get(snap["kind"], jobs)
+    raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+
+
+@router.get("/jobs/{job_id}", summary="Job status, current stage and result")
+def job_status(job_id: str):
+    return _find_job(job_id).get(job_id)
+
+
+@router.delete("/jobs/{job_id}", summary="Cancel a queued or running job")
+def cancel_job(job_id: str):
+    jobs = _find_job(job_id)
+    try:
+        cancelled = jobs.cancel(job_id)
+    except JobNotOwned as err:                  # another worker process runs it
+        raise HTTPException(status_code=409, detail=str(err)) from err
+    if not cancelled:
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' can no longer be cancelled")
+    return jobs.get(job_id)
+
+
+@router.get("/jobs/{job_id}/events", summary="Server-sent events with per-stage progress")
+async def job_events(job_id: str):
+    jobs = _find_job(job_id)
+
+    async def stream():
+        async for snap in jobs.events(job_id):
+            yield f"event: {snap['status']}\ndata: {json.dumps(snap, default=str)}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+# ---------------------------------------------------------------------------
+# Live coaching: PCM in, metric snapshots out
+# ---------------------------------------------------------------------------
+@router.websocket("/ws/coach")
+async def live_coach(ws: WebSocket, persona_id: str, sample_rate: int = SAMPLE_RATE):
+    """
+    Binary frames: 16-bit little-endian mono PCM at `sample_rate`, any size.
+    Every LIVE_HOP_MS the server answers with a `metrics` JSON message
+    (windowed pitch / intensity / pauses / rate + `delta` vs the persona).
+    Send the text frame {"type": "stop"} for a final snapshot and a clean close;
+    an unreadable control message gets an {"type": "error"} reply.
+    """
+    if sample_rate <= 0:
+        await ws.close(code=1008, reason="sample_rate must be positive")
+        return
+    try:
+        _, persona_prosody = style.load_persona(persona_id)
+    except KeyError:
+        await ws.close(code=1008, reason=f"Unknown persona '{persona_id}'")
+        return
+    await ws.accept()
+    coach = LiveCoach(persona_prosody, sample_rate=sample_rate)
+    try:
+        while True:
+            msg = await ws.receive()
+            if msg["type"] == "websocket.disconnect":
+                return
+            if msg.get("bytes"):
+                # Praat + numpy off the event loop; one chunk at a time per session
+                snap = await run_in_threadpool(coach.feed_pcm16, msg["bytes"])
+                if snap is not None:
+                    await ws.send_json(snap)
+            elif msg.get("text"):
+                try:
+                    control = json.loads(msg["text"])
+                    kind = control.get("type")
+                except (ValueError, AttributeError):
+                    await ws.send_json({"type": "error", "detail": "expected a JSON object"})
+                    continue
+                if kind == "stop":
+                    await ws.send_json(coach.snapshot() | {"type": "final"})
+                    await ws.close()
+                    return
+                await ws.send_json({"type": "error", "detail": f"unknown message type {kind!r}"})
+    except WebSocketDisconnect:
+        pass
@@ -9,6 +9,63 @@ MODEL_CACHE    = DATA_DIR / ".models"
 MODEL_CACHE.mkdir(exist_ok=True)
 SAMPLE_RATE    = 16_000
 PAUSE_THRESH_S = 0.25          # silence > threshold is trimmed
+MAX_UPLOAD_MB  = int(os.getenv("MAX_UPLOAD_MB", "50"))
+MAX_UPLOAD_S   = float(os.getenv("MAX_UPLOAD_S", "600"))   # longest accepted clip
 LLM_MODEL      = "gpt-4o-mini" # pick your OpenAI plan model
 OPENAI_KEY     = os.getenv("OPENAI_API_KEY")
-PERSONA_DIR    = (DATA_DIR / "personas").resolve()
\ No newline at end of file
+PERSONA_DIR    = (DATA_DIR / "personas").resolve()
+PERSONA_FEATURE_DIR = DATA_DIR / "embeddings" / "persona_features"
+RESULT_CACHE_DIR    = DATA_DIR / ".cache" / "results"
+RESULT_CACHE_MAX_MB = int(os.getenv("RESULT_CACHE_MAX_MB", "2048"))
+PERSONA_STORE_RELOAD_S = float(os.getenv("PERSONA_STORE_RELOAD_S", "5"))   # hot-reload poll
+LATENT_CACHE_DIR    = DATA_DIR / ".cache" / "xtts_latents"
+LATENT_CACHE_MAX_MB = int(os.getenv("LATENT_CACHE_MAX_MB", "512"))
+LATENT_CACHE_ITEMS  = int(os.getenv("LATENT_CACHE_ITEMS", "64"))   # in-memory LRU size
+
+# speech-to-text backend shared by /analyze, /analyze_and_clone and the CLI
+STT_BACKEND      = os.getenv("STT_BACKEND", "whisperx")    # whisperx | faster-whisper | ctranslate2 | openai-whisper
+STT_MODEL_SIZE   = os.getenv("STT_MODEL_SIZE", "base")
+STT_DEVICE       = os.getenv("STT_DEVICE", "auto")         # auto | cpu | cuda
+STT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "auto")   # auto → float16 on GPU, int8 on CPU
+STT_THREADS      = int(os.getenv("STT_THREADS", "4"))
+
+# language metrics only need a tokenizer: "blank:en" (no weights) or a slim model
+SPACY_MODEL    = os.getenv("SPACY_MODEL", "blank:en")    # blank:en | en_core_web_sm | ...
+LANG_N_PROCESS = int(os.getenv("LANG_N_PROCESS", "1"))   # nlp.pipe workers for cohorts
+
+# models loaded once per worker at start-up (comma-separated, empty = lazy)
+PRELOAD_TRANSCRIBERS = [n for n in os.getenv("PRELOAD_TRANSCRIBERS", STT_BACKEND).split(",") if n]
+PRELOAD_COACHES      = [n for n in os.getenv("PRELOAD_COACHES", "openai").split(",") if n]
+PRELOAD_EXTRAS       = [n for n in os.getenv("PRELOAD_EXTRAS", "spacy,voice_encoder").split(",") if n]  # + "xtts"
+WARMUP_IN_BACKGROUND = os.getenv("WARMUP_IN_BACKGROUND", "1") == "1"   # 0 = block start-up until loaded
+
+# /jobs: bounded in-process worker pool; set JOB_DB to share state via SQLite
+JOB_WORKERS    = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "16"))
+JOB_DB         = Path(os.environ["JOB_DB"]) if os.getenv("JOB_DB") else None
+# voice cloning runs on its own small pool so XTTS never starves analyses
+CLONE_WORKERS    = int(os.getenv("CLONE_WORKERS", "1"))
+CLONE_QUEUE_SIZE = int(os.getenv("CLONE_QUEUE_SIZE", "8"))
+
+# run_pipeline stage DAG: shared pools per worker process
+STAGE_THREADS   = int(os.getenv("STAGE_THREADS", "4"))
+STAGE_PROCESSES = int(os.getenv("STAGE_PROCESSES", "2"))
+PROSODY_POOL    = os.getenv("PROSODY_POOL", "thread")   # "process" to sidestep the GIL for Praat
+
+# recordings longer than LONGFORM_MIN_S are analysed in overlapping windows
+# (speech_compare/longform.py) instead of being decoded whole
+LONGFORM_MIN_S     = float(os.getenv("LONGFORM_MIN_S", "300"))
+LONGFORM_WINDOW_S  = float(os.getenv("LONGFORM_WINDOW_S", "60"))
+LONGFORM_OVERLAP_S = float(os.getenv("LONGFORM_OVERLAP_S", "4"))
+# /analyze and /jobs/analyze stream long uploads, so they accept far more than
+# MAX_UPLOAD_* (an hour of 44.1 kHz stereo WAV is ~635 MB)
+LONGFORM_MAX_UPLOAD_MB = int(os.getenv("LONGFORM_MAX_UPLOAD_MB", "2048"))
+LONGFORM_MAX_UPLOAD_S  = float(os.getenv("LONGFORM_MAX_UPLOAD_S", "14400"))   # 4 h
+
+# /ws/coach live metrics: analysis window and how often a snapshot is pushed
+LIVE_WINDOW_S = float(os.getenv("LIVE_WINDOW_S", "10"))
+LIVE_HOP_MS   = float(os.getenv("LIVE_HOP_MS", "250"))
+
+# micro-batching of concurrent transcription requests (1 = off)
+STT_BATCH_MAX_ITEMS   = int(os.getenv("STT_BATCH_MAX_ITEMS", "1"))
+STT_BATCH_MAX_WAIT_MS = float(os.getenv("STT_BATCH_MAX_WAIT_MS", "25"))
@@ -1,6 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import router
+from fastapi.responses import JSONResponse
+import threading, time, traceback
+from app.api import router, analysis_jobs, clone_jobs
+from app.config import PRELOAD_TRANSCRIBERS, PRELOAD_COACHES, PRELOAD_EXTRAS, WARMUP_IN_BACKGROUND
+from app.ml.registry import registry
+from app.utils.metrics import metrics as _metrics
+from app.speech_compare.transcribe import get_transcriber, fingerprint
+from app.speech_compare.coach import get_coach
+from app.speech_compare.stages import shutdown_pools
 app = FastAPI(
     title="Speak-Like-Idol API",
     version="0.1.0",
@@ -15,6 +23,61 @@ app.add_middleware(
 
 app.include_router(router)
 
+# Models load lazily on first use; warm-up just makes that "first use" happen
+# off the request path.  /health is liveness, /ready flips once warm-up is done.
+_warmup = {"state": "pending", "error": None, "seconds": None}
+
+def _extras():
+    from app.ml import style, tts
+    from app.speech_compare import language
+    return {"spacy": language.nlp, "voice_encoder": style.encoder, "xtts": tts._get_xtts}
+
+def warm_up():
+    t0 = time.perf_counter()
+    _warmup["state"] = "warming"
+    try:
+        fingerprint()                     # torch import + device probe, off the event loop
+        # pay the model load once per worker instead of once per request
+        for name in PRELOAD_TRANSCRIBERS: get_transcriber(name)
+        for name in PRELOAD_COACHES:      get_coach(name)
+        loaders = _extras()
+        for name in PRELOAD_EXTRAS:       loaders[name]()
+        _warmup["state"] = "ready"
+    except Exception as err:
+        print(traceback.format_exc())
+        _warmup.update(state="failed", error=repr(err))
+    _warmup["seconds"] = round(time.perf_counter() - t0, 2)
+
+@app.on_event("startup")
+def load_models():
+    if WARMUP_IN_BACKGROUND:
+        threading.Thread(target=warm_up, name="warmup", daemon=True).start()
+    else:
+        warm_up()
+
+@app.on_event("shutdown")
+def unload_models():
+    analysis_jobs.shutdown()
+    clone_jobs.shutdown()
+    shutdown_pools()
+    registry.clear()
+
 @app.get("/health", tags=["Meta"])
 def health():
     return {"status": "ok"}
+
+@app.get("/ready", tags=["Meta"])
+def ready():
+    """503 until the configured models are warm (failed warm-up stays 503)."""
+    body = _warmup | {"models": sorted(registry.stats())}
+    return JSONResponse(body, status_code=200 if _warmup["state"] == "ready" else 503)
+
+@app.get("/models", tags=["Meta"])
+def models():
+    """Load time / memory footprint of every model this worker holds."""
+    return registry.stats()
+
+@app.get("/metrics", tags=["Meta"])
+def metrics():
+    """Latency / batch-size percentiles and throughput of this worker."""
+    return _metrics.snapshot()
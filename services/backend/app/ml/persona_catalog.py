@@ -0,0 +1,94 @@
+# app/ml/persona_catalog.py
+"""
+Incremental persona catalogue builder
+-------------------------------------
+Rebuilds the persona store (app/ml/persona_store.py) from a directory of
+persona WAVs, recomputing only what changed:
+
+• every generation carries a manifest {pid: {"sha256", "version"}};
+  personas whose source hash and CATALOG_VERSION match are copied over
+  from the current generation untouched
+• new / changed personas are encoded on a process pool, one voice
+  encoder per worker (loaded by the pool initializer)
+• the merged catalogue is written as a new generation and CURRENT is
+  swapped atomically – running API workers pick it up on their next
+  style.store() call, no restart needed
+
+Bump CATALOG_VERSION whenever style.extract() changes.
+"""
+
+from __future__ import annotations
+import time, traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from app.ml import style
+from app.ml.persona_store import STORE_NAME, open_store, write_store
+from app.utils.audio import AudioBuffer
+from app.utils.cache import sha256_file
+
+CATALOG_VERSION = 2
+
+
+def _init_worker() -> None:
+    style.encoder()                        # load once per worker process
+
+
+def _encode(pid: str, wav_path: str) -> tuple[str, list[float], dict]:
+    embed, prosody = style.extract(AudioBuffer.from_file(wav_path))
+    return pid, embed.tolist(), {k: float(v) for k, v in prosody.items()}
+
+
+def build_catalog(wav_dir: Path, out_dir: Path = style.PERSONA_DIR, workers: int = 2,
+                  force: bool = False) -> Path | None:
+    """Bring the store under `out_dir` up to date with `wav_dir`.
+
+    Returns the new generation directory, or None if nothing changed.
+    """
+    wavs = {p.stem.lower(): p for p in sorted(wav_dir.glob("*.wav"))}   # mrbeast.wav → mrbeast
+    try:
+        old = open_store(out_dir)
+    except FileNotFoundError:
+        old = None
+    previous = old.manifest if old is not None else {}
+
+    manifest = {pid: {"sha256": sha256_file(p), "version": CATALOG_VERSION}
+                for pid, p in wavs.items()}
+    todo = [pid for pid in wavs
+            if force or previous.get(pid) != manifest[pid] or pid not in old]
+    removed = sorted(set(old.ids) - wavs.keys()) if old is not None else []
+    print(f"{len(wavs)} personas: {len(todo)} to encode, "
+          f"{len(wavs) - len(todo)} unchanged, {len(removed)} removed")
+    if not todo and not removed:
+        return None
+
+    fresh: dict[str, tuple[list[float], dict]] = {}
+    t0 = time.perf_counter()
+    if todo:
+        with ProcessPoolExecutor(min(workers, len(todo)), initializer=_init_worker) as pool:
+            futures = {pool.submit(_encode, pid, str(wavs[pid])): pid for pid in todo}
+            for fut in as_completed(futures):
+                pid = futures[fut]
+                try:
+                    _, embed, prosody = fut.result()
+                except Exception:
+                    print(traceback.format_exc())
+                    manifest.pop(pid)              # retried on the next run
+                    continue
+                fresh[pid] = (embed, prosody)
+                print(f"  ✅ {pid}  ({len(fresh)}/{len(todo)}, {time.perf_counter() - t0:.1f}s)")
+
+    # merge: fresh rows win; unchanged rows – and the last good row of a persona
+    # that failed this time (no manifest entry, so it is retried) – are copied
+    ids, embeddings, prosody = [], [], []
+    for pid in sorted(wavs):
+        if pid in fresh:
+            embed, pros = fresh[pid]
+        elif old is not None and pid in old:
+            embed, pros = old.get(pid)
+        else:
+            continue
+        ids.append(pid)
+        embeddings.append(embed)
+        prosody.append(pros)
+    return write_store(out_dir / STORE_NAME, ids, embeddings, prosody, manifest=manifest)
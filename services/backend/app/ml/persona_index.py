@@ -0,0 +1,70 @@
+# app/ml/persona_index.py
+"""
+Persona similarity index
+------------------------
+All persona voice embeddings as one contiguous, L2-normalised float32
+matrix, so ranking a user against the whole catalogue is a single
+matrix-vector product instead of a Python loop of cosine similarities.
+
+    idx = get_index()
+    idx.top_k(user_vec, k=5)        -> [("morganfreeman", 0.83), ...]
+
+The matrix is the persona store's embeddings.npy, opened with
+mmap_mode="r": start-up cost is independent of catalogue size and worker
+processes share the same page-cache pages.
+"""
+
+from __future__ import annotations
+import numpy as np
+
+from app.ml.registry import registry
+from app.ml.persona_store import PersonaStore, _normalise
+from app.ml.style import store
+
+
+class PersonaIndex:
+    def __init__(self, ids: list[str], matrix: np.ndarray) -> None:
+        if len(ids) != len(matrix):
+            raise ValueError(f"{len(ids)} ids for {len(matrix)} embeddings")
+        self.ids = list(ids)
+        self.matrix = matrix                       # (n, dim) float32, unit rows; may be a memmap
+        self._row = {pid: i for i, pid in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, pid: str) -> bool:
+        return pid in self._row
+
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def from_store(cls, store: PersonaStore) -> "PersonaIndex":
+        return cls(store.ids, store.embeddings)          # already unit rows, no copy
+
+    # ------------------------------------------------------------------ #
+    def scores(self, vec) -> np.ndarray:
+        """Cosine similarity of `vec` to every persona, in row order."""
+        q = _normalise(np.asarray(vec).ravel())
+        return self.matrix @ q
+
+    def top_k(self, vec, k: int = 5, exclude: tuple[str, ...] = ()) -> list[tuple[str, float]]:
+        scores = self.scores(vec)
+        if exclude:
+            scores = scores.copy()
+            scores[[self._row[p] for p in exclude if p in self._row]] = -np.inf
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]             # O(n), then sort just k
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    def similarity(self, vec, pid: str) -> float:
+        row = self.matrix[self._row[pid]]
+        return float(row @ _normalise(np.asarray(vec).ravel()))
+
+
+def get_index() -> PersonaIndex:
+    """Shared per-worker index over the persona store."""
+    current = store()                                   # also the hot-reload check
+    return registry.get("style:persona_index", lambda: PersonaIndex.from_store(current))
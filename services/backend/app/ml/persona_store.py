@@ -0,0 +1,230 @@
+# app/ml/persona_store.py
+"""
+Binary persona store
+--------------------
+Replaces the indented personas_meta.json (every embedding as a JSON float
+list, parsed in full on first use) with row-aligned binary files::
+
+    persona_store/CURRENT                  -> "gen-<timestamp>"
+    persona_store/gen-<timestamp>/ids.json        ["morganfreeman", ...]
+    persona_store/gen-<timestamp>/embeddings.npy  (n, dim) float32, unit rows
+    persona_store/gen-<timestamp>/prosody.npy     (n,) structured: mean_pitch, wpm
+    persona_store/gen-<timestamp>/manifest.json   {pid: {"sha256", "version"}} (builder)
+
+Nothing is read until it is needed and the .npy files are opened with
+mmap_mode="r", so looking up one persona touches one row, not the catalogue.
+A writer fills a fresh generation directory and then swaps CURRENT with
+os.replace – readers only ever see a complete generation.
+
+    store = open_store()
+    store.get("morganfreeman")  -> (embedding, {"mean_pitch": ..., "wpm": ...})
+    store.embeddings            -> memmap for PersonaIndex
+
+open_store() falls back to personas_meta.json (and converts it) when no
+binary store has been written yet.
+
+Several API workers may open the store while a build is running, so
+persona_store/.lock (flock) serialises writers: conversion, the CURRENT swap
+and pruning hold it exclusively, and open_store holds it shared while it
+resolves CURRENT and opens that generation's files.  Once open, the mmaps
+stay valid even if a later build prunes the directory.
+"""
+
+from __future__ import annotations
+import contextlib, functools, json, os, shutil, time
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:                  # no flock (Windows): single-process dev only
+    fcntl = None
+
+STORE_NAME = "persona_store"
+META_JSON  = "personas_meta.json"
+KEEP_GENERATIONS = 2                 # the live one + the one a slow reader may still hold
+
+
+def _normalise(m: np.ndarray) -> np.ndarray:
+    m = np.asarray(m, dtype=np.float32)
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    return m / np.maximum(norms, np.float32(1e-12))
+
+
+def _prosody_table(prosody: Sequence[dict]) -> np.ndarray:
+    fields = sorted({k for p in prosody for k in p}) or ["mean_pitch", "wpm"]
+    table = np.full(len(prosody), np.nan, dtype=[(f, "f8") for f in fields])
+    for i, p in enumerate(prosody):
+        for k, v in p.items():
+            table[i][k] = v
+    return table
+
+
+class PersonaStore:
+    """Lazy, read-only view of one store generation (or of in-memory arrays)."""
+
+    def __init__(self, directory: Path | None = None, *, ids: list[str] | None = None,
+                 embeddings: np.ndarray | None = None, prosody: np.ndarray | None = None) -> None:
+        self.directory = directory
+        if ids is not None:
+            self.__dict__.update(ids=list(ids), embeddings=embeddings, prosody=prosody)
+
+    # ---- lazily opened parts ---------------------------------------- #
+    @functools.cached_property
+    def ids(self) -> list[str]:
+        return json.loads((self.directory / "ids.json").read_text())
+
+    @functools.cached_property
+    def embeddings(self) -> np.ndarray:
+        return np.load(self.directory / "embeddings.npy", mmap_mode="r")
+
+    @functools.cached_property
+    def prosody(self) -> np.ndarray:
+        return np.load(self.directory / "prosody.npy", mmap_mode="r")
+
+    @functools.cached_property
+    def manifest(self) -> dict[str, dict]:
+        """Source hash + feature version per persona; empty for converted JSON."""
+        path = self.directory / "manifest.json" if self.directory else None
+        return json.loads(path.read_text()) if path and path.exists() else {}
+
+    @functools.cached_property
+    def _row(self) -> dict[str, int]:
+        return {pid: i for i, pid in enumerate(self.ids)}
+
+    def load(self) -> "PersonaStore":
+        """Open every file of the generation now instead of on first use."""
+        if self.directory is not None:
+            for part in ("ids", "embeddings", "prosody", "manifest"):
+                getattr(self, part)
+        return self
+
+    # ---- lookups ------------------------------------------------------ #
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, pid: str) -> bool:
+        return pid in self._row
+
+    def row(self, pid: str) -> int:
+        try:
+            return self._row[pid]
+        except KeyError:
+            raise KeyError(f"Unknown persona '{pid}'") from None
+
+    def embedding(self, pid: str) -> np.ndarray:
+        return np.array(self.embeddings[self.row(pid)])          # one row off the mmap
+
+    def prosody_of(self, pid: str) -> dict[str, float]:
+        rec = self.prosody[self.row(pid)]
+        return {f: float(rec[f]) for f in self.prosody.dtype.names}
+
+    def get(self, pid: str) -> tuple[np.ndarray, dict[str, float]]:
+        return self.embedding(pid), self.prosody_of(pid)
+
+    def take(self, pids: Sequence[str]) -> np.ndarray:
+        """Embeddings of just these personas (partial read)."""
+        return np.asarray(self.embeddings[[self.row(p) for p in pids]])
+
+    # ---- construction ------------------------------------------------- #
+    @classmethod
+    def from_records(cls, records: dict[str, dict]) -> "PersonaStore":
+        """In-memory store from {pid: {"embedding": [...], "prosody": {...}}}."""
+        ids = sorted(records)
+        return cls(ids=ids,
+                   embeddings=_normalise(np.array([records[p]["embedding"] for p in ids],
+                                                  dtype=np.float32).reshape(len(ids), -1)),
+                   prosody=_prosody_table([records[p]["prosody"] for p in ids]))
+
+    @classmethod
+    def from_meta(cls, meta_path: Path) -> "PersonaStore":
+        """Compatibility reader for the legacy personas_meta.json."""
+        return cls.from_records(json.loads(Path(meta_path).read_text()))
+
+    def write(self, root: Path) -> Path:
+        """Persist as a new generation under `root` and make it current."""
+        return write_store(root, self.ids, self.embeddings, self.prosody)
+
+
+@contextlib.contextmanager
+def _locked(root: Path, exclusive: bool = True):
+    """flock on root/.lock; a no-op where the store can't be written anyway."""
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        fh = open(root / ".lock", "a+")
+    except OSError:                                   # read-only deploy: nothing to race with
+        yield
+        return
+    with fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield                                         # released when fh closes
+
+
+def write_store(root: Path, ids: Sequence[str], embeddings, prosody,
+                manifest: dict | None = None) -> Path:
+    """Write a complete generation, then atomically point CURRENT at it.
+
+    `prosody` is either a structured array or a list of dicts, row-aligned
+    with `ids`.
+    """
+    with _locked(root):
+        return _write_generation(root, ids, embeddings, prosody, manifest)
+
+
+def _write_generation(root: Path, ids: Sequence[str], embeddings, prosody,
+                      manifest: dict | None) -> Path:
+    root.mkdir(parents=True, exist_ok=True)
+    gen = root / f"gen-{time.time_ns()}-{os.getpid()}"
+    gen.mkdir()
+    embeddings = np.ascontiguousarray(_normalise(np.asarray(embeddings).reshape(len(ids), -1)))
+    table = prosody if isinstance(prosody, np.ndarray) else _prosody_table(list(prosody))
+    np.save(gen / "embeddings.npy", embeddings)
+    np.save(gen / "prosody.npy", np.asarray(table))
+    (gen / "ids.json").write_text(json.dumps(list(ids)))
+    if manifest is not None:
+        (gen / "manifest.json").write_text(json.dumps(manifest))
+
+    tmp = root / f"CURRENT.{os.getpid()}.tmp"
+    tmp.write_text(gen.name)
+    os.replace(tmp, root / "CURRENT")
+    _prune(root, keep=gen.name)
+    return gen
+
+
+def _prune(root: Path, keep: str) -> None:
+    # caller holds the exclusive lock, so no reader is between CURRENT and its files
+    gens = sorted(p for p in root.glob("gen-*") if p.is_dir() and p.name != keep)
+    for old in gens[: max(len(gens) - (KEEP_GENERATIONS - 1), 0)]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def current_generation(root: Path) -> Path | None:
+    try:
+        return root / (root / "CURRENT").read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def open_store(directory: Path) -> PersonaStore:
+    """Binary store under `directory`, converting personas_meta.json on first use."""
+    root = directory / STORE_NAME
+    with _locked(root, exclusive=False):
+        gen = current_generation(root)
+        if gen is not None:
+            return PersonaStore(gen).load()
+    meta = directory / META_JSON
+    if not meta.exists():
+        raise FileNotFoundError(f"No persona store in {root} and no {meta}")
+    with _locked(root):
+        gen = current_generation(root)                # another worker converted meanwhile
+        if gen is not None:
+            return PersonaStore(gen).load()
+        store = PersonaStore.from_meta(meta)
+        try:
+            return PersonaStore(_write_generation(root, store.ids, store.embeddings,
+                                                  store.prosody, None)).load()
+        except OSError:                               # read-only deploy: serve from memory
+            return store
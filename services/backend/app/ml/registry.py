@@ -0,0 +1,94 @@
+# app/ml/registry.py
+"""
+Process-wide model registry
+---------------------------
+Heavy models (WhisperX, local LLM coaches, …) are loaded once per worker
+and shared by every request.  Each entry records how long it took to load
+and how much resident memory the load added.
+
+    registry.get("transcriber:whisperx", lambda: WhisperXTranscriber())
+"""
+
+from __future__ import annotations
+import os, resource, sys, threading, time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict
+
+
+def _rss_bytes() -> tuple[int, bool]:
+    """(resident set size in bytes, whether that is the *peak* RSS) – best effort."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"), False
+    except (OSError, ValueError, IndexError):
+        # macOS / no procfs: only the peak is available – bytes on macOS, KiB elsewhere
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024, True
+
+
+@dataclass
+class ModelEntry:
+    name: str
+    model: Any
+    load_s: float
+    rss_delta_bytes: int
+    rss_is_peak: bool = False         # delta of peak RSS, not current RSS (no procfs)
+    loaded_at: float = field(default_factory=time.time)
+    hits: int = 0
+
+    def stats(self) -> dict:
+        return {
+            "load_s": round(self.load_s, 3),
+            ("peak_rss_delta_mb" if self.rss_is_peak else "rss_delta_mb"):
+                round(self.rss_delta_bytes / 2**20, 1),
+            "loaded_at": self.loaded_at,
+            "hits": self.hits,
+        }
+
+
+class ModelRegistry:
+    """Thread-safe, load-once cache of named models."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, ModelEntry] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str, loader: Callable[[], Any]) -> Any:
+        entry = self._entries.get(name)
+        if entry is None:
+            # one lock per model so a slow WhisperX load doesn't block the coach
+            with self._lock_for(name):
+                entry = self._entries.get(name)
+                if entry is None:
+                    (rss0, _), t0 = _rss_bytes(), time.perf_counter()
+                    model = loader()
+                    rss1, is_peak = _rss_bytes()
+                    entry = ModelEntry(name, model,
+                                       load_s=time.perf_counter() - t0,
+                                       rss_delta_bytes=max(rss1 - rss0, 0), rss_is_peak=is_peak)
+                    self._entries[name] = entry
+        entry.hits += 1
+        return entry.model
+
+    def loaded(self, name: str) -> bool:
+        return name in self._entries
+
+    def unload(self, name: str) -> None:
+        with self._lock_for(name):
+            self._entries.pop(name, None)
+
+    def clear(self) -> None:
+        with self._guard:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, dict]:
+        return {name: e.stats() for name, e in self._entries.items()}
+
+
+# the one registry every module in this worker shares
+registry = ModelRegistry()
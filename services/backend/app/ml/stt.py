@@ -1,8 +1,6 @@
-# Whisper interface
-import whisper
+# Whisper interface – same pluggable backends as speech_compare (STT_BACKEND)
+from app.utils.audio import AudioLike
+from app.speech_compare.transcribe import get_transcriber
 
-_model = whisper.load_model("base")
-
-def transcribe(path: str) -> str:
-    result = _model.transcribe(path, fp16=False, language="en")
-    return result["text"].strip()
+def transcribe(path: AudioLike) -> str:
+    return get_transcriber().transcribe(path)["text"].strip()
@@ -1,27 +1,52 @@
 # Style profiling
-import numpy as np, json, parselmouth
-from resemblyzer import VoiceEncoder, preprocess_wav
-import librosa, pathlib
+import pathlib, threading, time
+from app.config import PERSONA_STORE_RELOAD_S
+from app.utils.audio import AudioLike, as_buffer
+from app.speech_compare.acoustics import Acoustics
+from app.ml.registry import registry
+from app.ml.persona_store import PersonaStore, STORE_NAME, current_generation, open_store
 
-encoder = VoiceEncoder()
+# resemblyzer (torch) and librosa are imported on first use, not at API start-up
+def encoder():
+    def load():
+        from resemblyzer import VoiceEncoder
+        return VoiceEncoder()
+    return registry.get("style:voice_encoder", load)
 
-# --- personas pre-computed at repo clone ---
+# --- personas pre-computed at repo clone (binary store, JSON as fallback) ---
 PERSONA_DIR = pathlib.Path(__file__).parent.parent.parent / "data" / "embeddings"
-personas = json.loads((PERSONA_DIR / "personas_meta.json").read_text())
 
-def extract(wav_path: str):
-    wav = preprocess_wav(wav_path)
-    embed = encoder.embed_utterance(wav)
+_reload = {"checked": 0.0, "lock": threading.Lock()}
 
-    snd = parselmouth.Sound(wav_path)
-    pitch = snd.to_pitch()
-    mean_pitch = pitch.selected_array['frequency'][pitch.selected_array['frequency']>0].mean()
-    duration = snd.get_total_duration()
-    words = len(librosa.effects.split(librosa.load(wav_path, sr=16000)[0]))
+def store() -> PersonaStore:
+    """Current persona store; picks up a newly built generation without a restart."""
+    s = registry.get("style:persona_store", lambda: open_store(PERSONA_DIR))
+    now = time.monotonic()
+    if s.directory is not None and now - _reload["checked"] > PERSONA_STORE_RELOAD_S:
+        with _reload["lock"]:
+            _reload["checked"] = now
+            if current_generation(PERSONA_DIR / STORE_NAME) != s.directory:
+                registry.unload("style:persona_store")
+                registry.unload("style:persona_index")      # built from the old rows
+                s = registry.get("style:persona_store", lambda: open_store(PERSONA_DIR))
+    return s
+
+def extract(audio: AudioLike):
+    import librosa
+    from resemblyzer import preprocess_wav
+    buf = as_buffer(audio)                       # decoded once, shared below
+    wav = preprocess_wav(buf.samples, source_sr=buf.sample_rate)
+    embed = encoder().embed_utterance(wav)
+
+    ac = Acoustics.from_audio(buf)               # same pitch analysis as prosody_metrics
+    mean_pitch = ac.mean_pitch()
+    duration = ac.duration_s
+    samples = buf.samples if buf.sample_rate == 16000 else librosa.resample(
+        buf.samples, orig_sr=buf.sample_rate, target_sr=16000)
+    words = len(librosa.effects.split(samples))
     wpm = words / (duration/60)
 
     return embed, {"mean_pitch": mean_pitch, "wpm": wpm}
 
 def load_persona(pid: str):
-    meta = personas[pid]
-    return np.array(meta["embedding"]), meta["prosody"]
+    return store().get(pid)
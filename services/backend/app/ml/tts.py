@@ -3,17 +3,64 @@ Requires:
   pip install TTS soundfile numpy
 """
 
-import io
+import io, re, threading
+from collections import OrderedDict
+from typing import Iterator
+import numpy as np
 import soundfile as sf
-from TTS.api import TTS
-import torch
-# ── 1. Load XTTS-v2 once at start-up ────────────────────────────────
+from app.config import LATENT_CACHE_DIR, LATENT_CACHE_MAX_MB, LATENT_CACHE_ITEMS
+from app.ml.registry import registry
+from app.utils.audio import wav_header
+from app.utils.cache import DiskCache, sha256_file
+
+XTTS_SR = 24000
+# ── 1. Load XTTS-v2 lazily, once per worker ─────────────────────────
 # The first call downloads the model (~400 MB) and initialises GPUs if available.
+# Importing this module is cheap; the model loads on first clone() or warm-up.
+
+def _get_xtts():
+    def load():
+        import torch
+        from TTS.api import TTS
+        return TTS(model_name="tts_models/multilingual/multi-dataset/xtts_v2",
+                   progress_bar=False, gpu=torch.cuda.is_available())
+    return registry.get("tts:xtts_v2", load)
+
+# ── 1b. Speaker-conditioning cache ──────────────────────────────────
+# XTTS encodes the reference clip into (gpt_cond_latent, speaker_embedding)
+# before every synthesis.  Cache that per audio content hash: a small
+# in-memory LRU in front of a size-bounded LRU on disk.
+_latent_disk = DiskCache(LATENT_CACHE_DIR, LATENT_CACHE_MAX_MB * 2**20)
+_latent_mem: "OrderedDict[str, tuple]" = OrderedDict()
+_latent_lock = threading.Lock()
+
+def speaker_latents(user_wav: str, audio_sha256: str | None = None):
+    """(gpt_cond_latent, speaker_embedding) for `user_wav`, encoded at most once."""
+    import torch
+    key = DiskCache.key(audio_sha256 or sha256_file(user_wav), model="xtts_v2")
+    with _latent_lock:
+        if key in _latent_mem:
+            _latent_mem.move_to_end(key)
+            return _latent_mem[key]
 
-device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = _get_xtts().synthesizer.tts_model
+    computed = {}
+    def encode(dest):
+        computed["latents"] = model.get_conditioning_latents(audio_path=[str(user_wav)])
+        gpt, spk = computed["latents"]
+        torch.save({"gpt_cond_latent": gpt.cpu(), "speaker_embedding": spk.cpu()}, dest)
+    path = _latent_disk.memo_file(key, "latents.pt", encode)
+    if "latents" in computed:
+        latents = computed["latents"]
+    else:
+        blob = torch.load(path, map_location=model.device)
+        latents = (blob["gpt_cond_latent"], blob["speaker_embedding"])
 
-_xtts = TTS(model_name="tts_models/multilingual/multi-dataset/xtts_v2",
-            progress_bar=False, gpu=True)   # set gpu=False to force CPU
+    with _latent_lock:
+        _latent_mem[key] = latents
+        while len(_latent_mem) > LATENT_CACHE_ITEMS:
+            _latent_mem.popitem(last=False)
+    return latents
 
 # ── 2. (Optional) very light “style” mapping  ───────────────────────
 # XTTS doesn’t have ElevenLabs-style ‘VoiceSettings’, but we can tweak
@@ -25,7 +72,8 @@ _style_map = {
 }
 
 # ── 3. The public helper you’ll import elsewhere ────────────────────
-def clone(text: str, user_wav: str, persona_style: str = "mrbeast") -> bytes:
+def clone(text: str, user_wav: str, persona_style: str = "mrbeast",
+          audio_sha256: str | None = None) -> bytes:
     """
     Generate speech that mimics the voice in `user_wav`.
     
@@ -33,6 +81,7 @@ def clone(text: str, user_wav: str, persona_style: str = "mrbeast") -> bytes:
         text:           Text to speak.
         user_wav:       Path to a short reference clip (≈6–10 s, 16-24 kHz).
         persona_style:  One of the keys in _style_map (optional).
+        audio_sha256:   Content hash of `user_wav`, if the caller already has it.
 
     Returns:
         WAV bytes (PCM 24 kHz, 16-bit, mono).
@@ -40,13 +89,53 @@ def clone(text: str, user_wav: str, persona_style: str = "mrbeast") -> bytes:
     # Pick style parameters if available
     style_args = _style_map.get(persona_style, {})
 
-    # Run TTS – returns a NumPy array at 24 kHz
-    audio = _xtts.tts(text=text,
-                      speaker_wav=user_wav,
-                      language="en",
-                      **style_args)
+    # Run TTS with cached speaker conditioning – returns a NumPy array at 24 kHz
+    gpt_cond_latent, speaker_embedding = speaker_latents(user_wav, audio_sha256)
+    out = _get_xtts().synthesizer.tts_model.inference(
+        text, "en", gpt_cond_latent, speaker_embedding,
+        enable_text_splitting=True, **style_args)
+    audio = np.asarray(out["wav"])
 
     # Convert the NumPy signal to in-memory WAV bytes
     with io.BytesIO() as buf:
-        sf.write(buf, audio, samplerate=24000, format="WAV")
+        sf.write(buf, audio, samplerate=XTTS_SR, format="WAV")
         return buf.getvalue()
+
+
+# ── 4. Streaming variant ────────────────────────────────────────────
+# XTTS accepts ~250 chars per call; anything longer is split on sentence ends.
+_SENTENCE = re.compile(r"(?<=[.!?…])\s+")
+
+def split_sentences(text: str, max_chars: int = 250) -> list[str]:
+    out: list[str] = []
+    for sentence in _SENTENCE.split(text.strip()):
+        while len(sentence) > max_chars:                      # very long run-on sentence
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            out.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            out.append(sentence)
+    return out
+
+def _pcm16(chunk) -> bytes:
+    arr = chunk.detach().cpu().numpy() if hasattr(chunk, "detach") else np.asarray(chunk)
+    return (np.clip(arr.reshape(-1), -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+def clone_stream(text: str, user_wav: str, persona_style: str = "mrbeast",
+                 audio_sha256: str | None = None) -> Iterator[bytes]:
+    """
+    Same voice as clone(), but yields a WAV header and then raw PCM chunks
+    as XTTS produces them (sentence by sentence, each via inference_stream),
+    so playback can start long before the whole utterance is synthesised.
+    """
+    style_args = _style_map.get(persona_style, {})
+    model = _get_xtts().synthesizer.tts_model
+    # speaker conditioning from the latent cache, not once per sentence
+    gpt_cond_latent, speaker_embedding = speaker_latents(user_wav, audio_sha256)
+
+    yield wav_header(XTTS_SR)
+    for sentence in split_sentences(text):
+        for chunk in model.inference_stream(sentence, "en", gpt_cond_latent,
+                                            speaker_embedding, **style_args):
+            yield _pcm16(chunk)
@@ -0,0 +1,102 @@
+# speech_compare/acoustics.py
+"""
+Shared Praat analysis
+---------------------
+One Sound → one Pitch → one PointProcess per clip, with a single set of
+parameters, and every voice metric derived from those objects.  Used by
+features.prosody_metrics, ml/style.extract and scripts/prosody_chart.py so
+the numbers agree across endpoints and no caller runs its own pitch pass.
+
+    ac = Acoustics.from_audio(buf)
+    ac.f0                  voiced F0 values (Hz)
+    ac.jitter_local(), ac.shimmer_local(), ac.hnr_db()
+    ac.prosody()           -> the prosody_metrics dict
+
+Intensity and harmonicity are only computed if something asks for them.
+"""
+
+from __future__ import annotations
+import functools
+
+import numpy as np
+
+from app.utils.audio import AudioLike, as_buffer
+
+PITCH_TIME_STEP = 0.01       # s
+PITCH_FLOOR     = 75.0       # Hz
+PITCH_CEILING   = 500.0      # Hz
+
+# Praat's standard jitter / shimmer arguments
+PERIOD_FLOOR, PERIOD_CEILING, MAX_PERIOD_FACTOR, MAX_AMPLITUDE_FACTOR = 0.0001, 0.02, 1.3, 1.6
+
+
+class Acoustics:
+    def __init__(self, sound) -> None:
+        self.sound = sound                           # parselmouth.Sound
+
+    @classmethod
+    def from_audio(cls, audio: AudioLike) -> "Acoustics":
+        return cls(as_buffer(audio).to_sound())
+
+    # ---- Praat objects, each computed at most once -------------------- #
+    @functools.cached_property
+    def pitch(self):
+        # autocorrelation pitch – what "To PointProcess (periodic, cc)" computes internally
+        return self.sound.to_pitch_ac(time_step=PITCH_TIME_STEP, pitch_floor=PITCH_FLOOR,
+                                      pitch_ceiling=PITCH_CEILING)
+
+    @functools.cached_property
+    def point_process(self):
+        import parselmouth.praat as praat
+        return praat.call([self.sound, self.pitch], "To PointProcess (cc)")   # reuses self.pitch
+
+    @functools.cached_property
+    def intensity(self):
+        return self.sound.to_intensity(minimum_pitch=PITCH_FLOOR, time_step=PITCH_TIME_STEP)
+
+    @functools.cached_property
+    def harmonicity(self):
+        return self.sound.to_harmonicity_cc(time_step=PITCH_TIME_STEP, minimum_pitch=PITCH_FLOOR)
+
+    # ---- derived values ----------------------------------------------- #
+    @property
+    def duration_s(self) -> float:
+        return self.sound.get_total_duration()
+
+    @functools.cached_property
+    def f0(self) -> np.ndarray:
+        freqs = self.pitch.selected_array["frequency"]
+        return freqs[freqs > 0]                      # unvoiced frames are 0
+
+    def mean_pitch(self) -> float:
+        return float(self.f0.mean()) if self.f0.size else float("nan")
+
+    def pitch_iqr(self) -> float:
+        if not self.f0.size:
+            return float("nan")
+        return float(np.subtract(*np.percentile(self.f0, [75, 25])))
+
+    def jitter_local(self) -> float:
+        import parselmouth.praat as praat
+        return float(praat.call(self.point_process, "Get jitter (local)", 0, 0,
+                                PERIOD_FLOOR, PERIOD_CEILING, MAX_PERIOD_FACTOR))
+
+    def shimmer_local(self) -> float:
+        import parselmouth.praat as praat
+        return float(praat.call([self.sound, self.point_process], "Get shimmer (local)", 0, 0,
+                                PERIOD_FLOOR, PERIOD_CEILING, MAX_PERIOD_FACTOR,
+                                MAX_AMPLITUDE_FACTOR))
+
+    def hnr_db(self) -> float:
+        values = self.harmonicity.values
+        voiced = values[values != -200]              # Praat marks unvoiced frames -200 dB
+        return float(voiced.mean()) if voiced.size else float("nan")
+
+    def prosody(self) -> dict:
+        return {
+            "duration_s"    : self.duration_s,
+            "mean_pitch_Hz" : self.mean_pitch(),
+            "pitch_IQR_Hz"  : self.pitch_iqr(),
+            "jitter_local"  : self.jitter_local(),
+            "shimmer_local" : self.shimmer_local(),
+        }
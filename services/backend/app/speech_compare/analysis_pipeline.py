@@ -1,45 +1,129 @@
-import traceback
+import logging
 from pathlib import Path
 
-from app.config import REPORT_DIR
-from app.speech_compare.ingest import preprocess
-from app.speech_compare.transcribe import get_transcriber
-from app.speech_compare.features import prosody_metrics, language_metrics, save_metrics
-from app.speech_compare.compare import diff
+from app.config import (REPORT_DIR, SAMPLE_RATE, PAUSE_THRESH_S, PROSODY_POOL, LONGFORM_MIN_S,
+                        LONGFORM_WINDOW_S, LONGFORM_OVERLAP_S)
+from app.speech_compare.ingest import load_clean
+from app.speech_compare.transcribe import get_transcriber, fingerprint
+from app.speech_compare.features import prosody_metrics, language_metrics, pause_metrics, save_metrics
+from app.speech_compare.timing import timing_metrics
+from app.speech_compare.longform import is_longform, longform_metrics
+from app.speech_compare import language
+from app.speech_compare.compare import diff, top_gaps
 from app.speech_compare.coach import get_coach
 from app.speech_compare.report import render
+from app.speech_compare import persona_features
+from app.speech_compare.stages import Stage, run_stages
+from app.utils.cache import result_cache
+from app.utils.audio import AudioLike, as_buffer
+from app.utils.jobs import JobCancelled
 
+log = logging.getLogger(__name__)
+
+
+def cache_key(audio_sha256: str) -> str:
+    """Result-cache key for a raw upload under the current pipeline config."""
+    return result_cache.key(audio_sha256, stage="analyze", transcriber=fingerprint(),
+                            sample_rate=SAMPLE_RATE, pause_thresh_s=PAUSE_THRESH_S,
+                            spacy_model=language.SPACY_MODEL,
+                            longform=(LONGFORM_MIN_S, LONGFORM_WINDOW_S, LONGFORM_OVERLAP_S))
+
+
+def transcript_text(segments: list[dict]) -> str:
+    return " ".join(seg['text'] for seg in segments)
+
+
+def _language(segments: list[dict], prosody: dict) -> dict:
+    return language_metrics(transcript_text(segments), prosody["duration_s"])
+
+
+def _pauses(audio) -> dict:
+    if "pauses" not in audio.meta:
+        return {}
+    return pause_metrics(audio.meta["pauses"], audio.meta["raw_duration_s"])
 
-def run_pipeline(user_wav: Path, persona_wav: Path, coach_name: str, run_id: str) -> Path:
-    """Core analysis; returns full path to HTML report."""
-    try:
-        transcriber = get_transcriber()
-        user_result = transcriber.transcribe(user_wav)['segments']
-        user_text    = " ".join([seg['text'] for seg in user_result])
-        persona_result = transcriber.transcribe(user_wav)['segments']
-        persona_text = " ".join([ seg['text'] for seg in persona_result])
 
-        
-        u_pros = prosody_metrics(user_wav)
-        u_lang = language_metrics(user_text, u_pros["duration_s"])
-        user_metrics = u_pros | u_lang
+def _timing(segments: list[dict], audio) -> dict:
+    return timing_metrics(segments, audio.meta.get("kept_s"))
 
-        p_pros = prosody_metrics(persona_wav)
-        p_lang = language_metrics(persona_text, p_pros["duration_s"])
-        user_metrics = p_pros | p_lang
 
-        user_metrics    = prosody_metrics(user_wav)    | language_metrics(user_text, u_pros["duration_s"])
-        persona_metrics = prosody_metrics(persona_wav) | language_metrics(persona_text, p_pros["duration_s"])
+def user_stages(user_audio: AudioLike, preprocess_user: bool = False,
+                transcribe=None, language: dict | None = None) -> dict[str, Stage]:
+    """Stage DAG for one clip; "metrics" is the merged dict.
+
+    `transcribe` / `language` let batch callers plug in results they
+    computed for a whole chunk at once.
+
+    audio ─┬─ segments ──┬─ timing ───┐
+           ├─ prosody ───┴─ language ─┤
+           └─ pauses ─────────────────┴─ metrics
+    """
+    transcribe = transcribe or (lambda audio: get_transcriber().transcribe(audio)['segments'])
+    return {
+        "audio"   : Stage(lambda: load_clean(user_audio) if preprocess_user else as_buffer(user_audio)),
+        "segments": Stage(transcribe, deps=("audio",)),
+        "prosody" : Stage(prosody_metrics, deps=("audio",), pool=PROSODY_POOL),
+        "pauses"  : Stage(_pauses, deps=("audio",)),
+        "language": (Stage(lambda: language) if language is not None
+                     else Stage(_language, deps=("segments", "prosody"))),
+        "timing"  : Stage(_timing, deps=("segments", "audio")),
+        "metrics" : Stage(lambda prosody, language, pauses, timing:
+                          prosody | language | pauses | timing,
+                          deps=("prosody", "language", "pauses", "timing")),
+    }
+
+
+def run_pipeline(user_audio: AudioLike, persona_wav: Path, coach_name: str, run_id: str,
+                 cache_key: str | None = None, progress=None,
+                 preprocess_user: bool = False) -> Path:
+    """Core analysis; returns full path to HTML report.
+
+    `user_audio` is the user clip (path or decoded AudioBuffer), already
+    cleaned unless `preprocess_user` is set; `persona_wav` is the raw persona
+    clip whose features come from the persona feature store.  With a
+    `cache_key` the user's segments and metrics are memoised in the result
+    cache, and a hit skips decoding the upload altogether.  Uploads longer
+    than LONGFORM_MIN_S are streamed through longform_metrics() instead of
+    being decoded whole.
+    `progress(stage, fraction)` is called as each stage finishes.
+    """
+    progress = progress or (lambda stage, fraction=None: None)
+
+    def memo(name, fn):
+        return result_cache.memo_json(cache_key, name, fn) if cache_key else fn()
+
+    try:
+        # persona lookup (a build on a store miss) overlaps the user analysis
+        stages = {"persona": Stage(lambda: persona_features.get(persona_wav.stem, persona_wav)["metrics"])}
+        user_metrics = result_cache.get_json(cache_key, "metrics") if cache_key else None
+        if user_metrics is None and preprocess_user and is_longform(user_audio):
+            stages["metrics"] = Stage(lambda: longform_metrics(
+                user_audio, progress=lambda f: progress("longform", 0.8 * f)))
+        elif user_metrics is None:
+            stages |= user_stages(
+                user_audio, preprocess_user,
+                transcribe=lambda audio: memo("segments", lambda: get_transcriber().transcribe(audio)['segments']))
+        run = run_stages(stages, progress=lambda name, f: progress(name, 0.8 * f))
+
+        if user_metrics is None:
+            user_metrics = run.results["metrics"]
+            if cache_key:
+                result_cache.put_json(cache_key, "metrics", user_metrics)
+        persona_metrics = run.results["persona"]
 
         delta = diff(user_metrics, persona_metrics)
-        gaps  = (delta["user"] - delta["persona"]).nlargest(3).to_dict()
+        gaps  = top_gaps(delta)
 
+        progress("coach", 0.85)
         coach = get_coach(name=coach_name)
         tips  = coach.advise(gaps)
 
+        progress("report", 0.95)
         report_path = REPORT_DIR / f"{run_id}.html"
         render(delta, tips, out_name=run_id)  # writes the HTML
         return report_path
-    except Exception as e:
-        print(traceback.format_exc())
-        raise Exception(e)
\ No newline at end of file
+    except JobCancelled:
+        raise                                   # the queue marks the job cancelled, not failed
+    except Exception:
+        log.exception("analysis %s failed", run_id)
+        raise
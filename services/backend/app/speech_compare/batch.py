@@ -0,0 +1,205 @@
+# speech_compare/batch.py
+"""
+Batch scoring of many recordings against many personas
+------------------------------------------------------
+Clips are split into chunks and fanned out over a process pool.  Each
+worker loads its models once (model registry), transcribes a whole chunk
+per call, runs the per-clip stage DAG and scores the clip against every
+requested persona from the persona feature store.
+
+Rows are appended to a CSV after every chunk, so a crashed run restarts
+where it left off: (item, persona) pairs already in the file are skipped.
+An `.parquet` output is written from that CSV once the run completes.
+"""
+
+from __future__ import annotations
+import csv, os, time, traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from app.config import PERSONA_DIR
+from app.speech_compare.ingest import load_clean
+from app.speech_compare.transcribe import get_transcriber
+from app.speech_compare.compare import diff
+from app.speech_compare.stages import run_stages
+from app.speech_compare.analysis_pipeline import user_stages, transcript_text
+from app.speech_compare.language import language_metrics_many
+from app.speech_compare import persona_features
+
+AUDIO_EXTS = {".wav", ".mp3", ".m4a", ".flac", ".ogg", ".webm"}
+BASE_COLUMNS = ["item", "persona", "status", "error", "score_user", "score_persona"]
+
+
+# --------------------------------------------------------------------------- #
+# Inputs
+# --------------------------------------------------------------------------- #
+def read_items(source: Path, personas: list[str]) -> list[tuple[str, str, str]]:
+    """(item_id, audio_path, persona_id) triples from a directory or manifest.
+
+    A manifest is a CSV with a `path` column (optional `persona` column,
+    which overrides `personas` for that row) or a plain list of paths.
+    """
+    if source.is_dir():
+        paths = sorted(p for p in source.rglob("*") if p.suffix.lower() in AUDIO_EXTS)
+        return [(str(p.relative_to(source)), str(p), pid) for p in paths for pid in personas]
+
+    base = source.parent
+    if source.suffix.lower() == ".csv":
+        with source.open(newline="") as fh:
+            rows = list(csv.DictReader(fh))
+        items = []
+        for row in rows:
+            path = base / row["path"]
+            for pid in ([row["persona"]] if row.get("persona") else personas):
+                items.append((row["path"], str(path), pid))
+        return items
+
+    lines = [l.strip() for l in source.read_text().splitlines() if l.strip()]
+    return [(l, str(base / l), pid) for l in lines for pid in personas]
+
+
+def all_personas() -> list[str]:
+    return sorted(p.stem for p in PERSONA_DIR.glob("*.wav"))
+
+
+def done_keys(csv_path: Path) -> set[tuple[str, str]]:
+    if not csv_path.exists():
+        return set()
+    with csv_path.open(newline="") as fh:
+        return {(r["item"], r["persona"]) for r in csv.DictReader(fh) if r.get("status") == "ok"}
+
+
+# --------------------------------------------------------------------------- #
+# Worker side
+# --------------------------------------------------------------------------- #
+def _init_worker(transcriber: str | None) -> None:
+    get_transcriber(transcriber)           # load once per worker process
+
+
+def _score_chunk(clips: list[tuple[str, str, list[str]]], transcriber: str | None) -> list[dict]:
+    """clips: (item_id, audio_path, [persona_ids]) → one row per (clip, persona)."""
+    rows: list[dict] = []
+    t0 = time.perf_counter()
+
+    decoded, failed = [], []
+    for item, path, pids in clips:
+        try:
+            decoded.append((item, pids, load_clean(Path(path))))
+        except Exception as err:
+            failed.append((item, pids, err))
+    t_decode = (time.perf_counter() - t0) / max(len(clips), 1)
+
+    # one batched transcription call for the whole chunk
+    t1 = time.perf_counter()
+    results = get_transcriber(transcriber).transcribe_batch([audio for _, _, audio in decoded])
+    t_transcribe = (time.perf_counter() - t1) / max(len(decoded), 1)
+
+    # one nlp.pipe pass over the chunk's transcripts (n_process=1: we already are a pool worker)
+    t2 = time.perf_counter()
+    languages = language_metrics_many([transcript_text(r["segments"]) for r in results],
+                                      [audio.duration_s for _, _, audio in decoded], n_process=1)
+    t_language = (time.perf_counter() - t2) / max(len(decoded), 1)
+
+    for (item, pids, audio), result, language in zip(decoded, results, languages):
+        try:
+            run = run_stages(user_stages(audio, transcribe=lambda _a, r=result: r["segments"],
+                                         language=language))
+            u_metrics = run.results["metrics"]
+        except Exception as err:
+            failed.append((item, pids, err))
+            continue
+        timings = {"t_decode_s": t_decode, "t_transcribe_s": t_transcribe,
+                   "t_language_s": t_language,
+                   **{f"t_{k}_s": v for k, v in run.timings.items()
+                      if k in ("prosody", "pauses", "timing")},
+                   "t_analysis_s": t_decode + t_transcribe + t_language + run.wall_s}
+        for pid in pids:
+            try:
+                p_metrics = persona_features.get(pid, PERSONA_DIR / f"{pid}.wav")["metrics"]
+                delta = diff(u_metrics, p_metrics)
+                row = {"item": item, "persona": pid, "status": "ok", "error": "",
+                       "score_user": delta.loc["score", "user"],
+                       "score_persona": delta.loc["score", "persona"]}
+                row |= {f"user_{k}": v for k, v in u_metrics.items()}
+                row |= {f"persona_{k}": v for k, v in p_metrics.items()}
+                rows.append(row | timings)
+            except Exception as err:
+                rows.append({"item": item, "persona": pid, "status": "error", "error": repr(err)})
+
+    for item, pids, err in failed:
+        rows += [{"item": item, "persona": pid, "status": "error", "error": repr(err)} for pid in pids]
+    return rows
+
+
+# --------------------------------------------------------------------------- #
+# Driver
+# --------------------------------------------------------------------------- #
+class _CSVSink:
+    """Append-only CSV; widened (rewritten once) if later rows bring new columns."""
+
+    def __init__(self, path: Path):
+        self.path, self.columns = path, []
+        if path.exists() and path.stat().st_size:
+            with path.open(newline="") as fh:
+                self.columns = next(csv.reader(fh))
+
+    def write(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        extra = sorted({k for r in rows for k in r} - set(self.columns) - set(BASE_COLUMNS))
+        if not self.columns or extra:
+            old = []
+            if self.columns:
+                with self.path.open(newline="") as fh:
+                    old = list(csv.DictReader(fh))
+            self.columns = BASE_COLUMNS + sorted(set(self.columns) - set(BASE_COLUMNS) | set(extra))
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with tmp.open("w", newline="") as fh:
+                w = csv.DictWriter(fh, self.columns)
+                w.writeheader()
+                w.writerows(old)
+            os.replace(tmp, self.path)
+        with self.path.open("a", newline="") as fh:
+            csv.DictWriter(fh, self.columns).writerows(rows)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+
+def run_batch(source: Path, out: Path, personas: list[str] | None = None,
+              workers: int = 2, chunk_size: int = 8, transcriber: str | None = None) -> Path:
+    personas = personas or all_personas()
+    parquet = out.suffix.lower() == ".parquet"
+    csv_path = out.with_suffix(".partial.csv") if parquet else out
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+
+    done = done_keys(csv_path)
+    todo: dict[tuple[str, str], list[str]] = {}
+    for item, path, pid in read_items(source, personas):
+        if (item, pid) not in done:
+            todo.setdefault((item, path), []).append(pid)
+    clips = [(item, path, pids) for (item, path), pids in todo.items()]
+    chunks = [clips[i:i + chunk_size] for i in range(0, len(clips), chunk_size)]
+    print(f"{len(clips)} clips to score ({len(done)} rows already done), {len(chunks)} chunks")
+
+    # personas are shared by every chunk – build any missing store records up front
+    for pid in personas:
+        persona_features.get(pid, PERSONA_DIR / f"{pid}.wav")
+
+    sink, t0, n = _CSVSink(csv_path), time.perf_counter(), 0
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(transcriber,)) as pool:
+        futures = {pool.submit(_score_chunk, chunk, transcriber): chunk for chunk in chunks}
+        for fut in as_completed(futures):
+            try:
+                rows = fut.result()
+            except Exception:
+                print(traceback.format_exc())
+                continue                      # whole chunk retried on the next run
+            sink.write(rows)
+            n += len(futures[fut])
+            print(f"  {n}/{len(clips)} clips  ({time.perf_counter() - t0:.1f}s)")
+
+    if parquet:
+        import pandas as pd
+        pd.read_csv(csv_path).to_parquet(out, index=False)
+    print(f"✅ Results written to {out}")
+    return out
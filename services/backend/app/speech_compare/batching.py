@@ -0,0 +1,77 @@
+# speech_compare/batching.py
+"""
+Micro-batching
+--------------
+Concurrent callers submit single items; a background thread gathers them
+for at most `max_wait_ms` (or until `max_items` are waiting) and runs one
+`batch_fn(items)` call.  Each caller gets its own result through a Future.
+
+Batch size, queue wait, end-to-end latency and throughput are recorded in
+app.utils.metrics under `<name>.*`, so the max_wait / max_items trade-off
+(throughput vs. p99 latency) can be tuned from GET /metrics.
+"""
+
+from __future__ import annotations
+import queue, threading, time
+from concurrent.futures import Future
+from typing import Any, Callable, Sequence
+
+from app.utils.metrics import metrics
+
+
+class MicroBatcher:
+    def __init__(self, batch_fn: Callable[[list[Any]], Sequence[Any]],
+                 max_items: int = 8, max_wait_ms: float = 25.0, name: str = "batch") -> None:
+        self.batch_fn = batch_fn
+        self.max_items = max_items
+        self.max_wait_s = max_wait_ms / 1000
+        self.name = name
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name=f"{name}-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        fut: Future = Future()
+        self._queue.put((item, fut, time.perf_counter()))
+        return fut
+
+    def __call__(self, item: Any) -> Any:
+        return self.submit(item).result()
+
+    def _collect(self) -> list[tuple[Any, Future, float]]:
+        batch = [self._queue.get()]                      # block for the first item
+        deadline = time.perf_counter() + self.max_wait_s
+        while len(batch) < self.max_items:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = [b for b in self._collect() if b[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            started = time.perf_counter()
+            for _, _, queued in batch:
+                metrics.observe(f"{self.name}.queue_wait_ms", (started - queued) * 1000)
+            metrics.observe(f"{self.name}.batch_size", len(batch))
+            try:
+                results = self.batch_fn([item for item, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: batch_fn returned {len(results)} "
+                                       f"results for {len(batch)} items")
+                for (_, fut, _), res in zip(batch, results):
+                    fut.set_result(res)
+            except Exception as err:
+                for _, fut, _ in batch:
+                    fut.set_exception(err)
+            done = time.perf_counter()
+            metrics.observe(f"{self.name}.batch_ms", (done - started) * 1000)
+            for _, _, queued in batch:
+                metrics.observe(f"{self.name}.latency_ms", (done - queued) * 1000)
+            metrics.mark(f"{self.name}.throughput", len(batch))
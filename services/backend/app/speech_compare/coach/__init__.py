@@ -4,11 +4,11 @@ from .local_strategy import LocalLLMCoach
 from .rest_strategy import RestAPICoach
 from .base import CoachStrategy
 from .ollama_strategy import OllamaServerCoach  # add this import
+from app.ml.registry import registry
 
 
 
-def get_coach(name: str = "openai", **kwargs) -> CoachStrategy:
-    name = name.lower()
+def _build_coach(name: str, **kwargs) -> CoachStrategy:
     if name == "openai":
         return OpenAICoach(**kwargs)
     if name == "local":
@@ -18,3 +18,10 @@ def get_coach(name: str = "openai", **kwargs) -> CoachStrategy:
     if name == "ollama":
         return OllamaServerCoach(**kwargs)
     raise ValueError(f"Unknown coach strategy '{name}'.")
+
+
+def get_coach(name: str = "openai", **kwargs) -> CoachStrategy:
+    """Shared per-worker coach; e.g. LocalLLMCoach weights load only once."""
+    name = name.lower()
+    key = f"coach:{name}:" + ",".join(f"{k}={v!r}" for k, v in sorted(kwargs.items()))
+    return registry.get(key, lambda: _build_coach(name, **kwargs))
@@ -1,5 +1,4 @@
 # speech_compare/coach/local_strategy.py
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
 from .base import CoachStrategy
 
 class LocalLLMCoach(CoachStrategy):
@@ -8,6 +7,8 @@ class LocalLLMCoach(CoachStrategy):
     Replace with any fine-tuned model you host locally.
     """
     def __init__(self, model_name: str = "google/flan-t5-base", device: int = -1):
+        # transformers takes seconds to import – only pay it when this coach is used
+        from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
         tok = AutoTokenizer.from_pretrained(model_name)
         mod = AutoModelForSeq2SeqLM.from_pretrained(model_name)
         self.generator = pipeline("text2text-generation", model=mod, tokenizer=tok, device=device)
@@ -6,6 +6,12 @@ WEIGHTS = {
     "ttr": .15, "jitter_local": .10, "shimmer_local": .10
 }
 
+# timing.py's alternative speaking-rate measures share wpm's scale and would
+# crowd out every other gap; they stay in the table, but "wpm" alone stands for
+# speaking rate when picking coaching gaps and drawing the radar
+RATE_VARIANTS = ("speech_rate_wpm", "articulation_wpm", "seg_wpm_mean",
+                 "rolling_wpm_min", "rolling_wpm_max")
+
 def score(df: pd.DataFrame) -> pd.Series:
     # Normalise to 0-1 per column, then weighted sum
     norm = (df - df.min()) / (df.max() - df.min() + 1e-9)
@@ -15,3 +21,11 @@ def diff(user_metrics: dict, persona_metrics: dict) -> pd.DataFrame:
     df = pd.DataFrame([user_metrics, persona_metrics], index=["user","persona"])
     df["score"] = score(df)
     return df.T
+
+def chart_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """diff() rows worth coaching on / plotting: no score, no rate variants."""
+    return df.drop(index=["score", *RATE_VARIANTS], errors="ignore")
+
+def top_gaps(df: pd.DataFrame, n: int = 3) -> dict:
+    rows = chart_rows(df)
+    return (rows["user"] - rows["persona"]).nlargest(n).to_dict()
@@ -1,17 +1,124 @@
 # speech_compare/ingest.py
-from pydub import AudioSegment, effects, silence
-from app.config import SAMPLE_RATE, DATA_DIR, PAUSE_THRESH_S
+from app.config import SAMPLE_RATE, DATA_DIR, PAUSE_THRESH_S, MAX_UPLOAD_MB, MAX_UPLOAD_S
+from app.utils.audio import AudioBuffer
+from app.speech_compare.vad import normalize, dbfs, trim_silence
+from dataclasses import dataclass
 from pathlib import Path
+import asyncio, hashlib, struct
 
-def preprocess(src_path: Path) -> Path:
-    snd = AudioSegment.from_file(src_path).set_frame_rate(SAMPLE_RATE).set_channels(1)
-    snd = effects.normalize(snd)
-    chunks = silence.split_on_silence(
-        snd, min_silence_len=int(PAUSE_THRESH_S * 1000),
-        silence_thresh=snd.dBFS - 16, keep_silence=100
-    )
-    cleaned = AudioSegment.empty()
-    for ch in chunks: cleaned += ch
-    out = DATA_DIR / f"{src_path.stem}_clean.wav"
-    cleaned.export(out, format="wav")
-    return out
+def load_clean(src_path: Path) -> AudioBuffer:
+    """Decode, normalise and trim silences – entirely in memory.
+
+    Same semantics as pydub's normalize + split_on_silence; the cut pauses
+    are kept in `meta["pauses"]` and the retained ranges in `meta["kept_s"]`
+    (seconds, source timeline).
+    """
+    raw = AudioBuffer.from_file(src_path, sample_rate=SAMPLE_RATE)
+    snd = normalize(raw.samples)
+    trimmed = trim_silence(snd, SAMPLE_RATE, min_silence_s=PAUSE_THRESH_S,
+                           silence_thresh_db=dbfs(snd) - 16, keep_silence_ms=100)
+    return AudioBuffer(trimmed.samples, SAMPLE_RATE, source=Path(src_path),
+                       meta={"pauses": trimmed.pauses, "raw_duration_s": raw.duration_s,
+                             "kept_s": [(a / SAMPLE_RATE, b / SAMPLE_RATE) for a, b in trimmed.kept]})
+
+def preprocess(src_path: Path, out: Path | None = None) -> Path:
+    """load_clean() + write the result to disk (for callers that need a file)."""
+    out = out or DATA_DIR / f"{src_path.stem}_clean.wav"
+    return load_clean(src_path).write(out)
+
+
+# ---------------------------------------------------------------------------
+# Streaming upload ingest: bounded memory, early rejection, incremental hash
+# ---------------------------------------------------------------------------
+class UploadRejected(ValueError):
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.status_code = status_code
+
+@dataclass
+class WavHeader:
+    channels: int
+    sample_rate: int
+    bits: int
+    byte_rate: int
+    data_offset: int
+    data_bytes: int | None        # None when the writer didn't know (streamed WAVs)
+
+    @property
+    def duration_s(self) -> float | None:
+        return None if self.data_bytes is None else self.data_bytes / self.byte_rate
+
+@dataclass
+class Upload:
+    path: Path
+    sha256: str
+    size: int
+    wav: WavHeader | None
+
+_HEADER_MAX = 64 * 1024      # give up looking for the data chunk after this
+
+def parse_wav_header(head: bytes) -> WavHeader | None:
+    """Parse RIFF/WAVE up to the data chunk; None if `head` is still too short."""
+    if len(head) < 12:
+        return None
+    if head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        raise UploadRejected("Not a RIFF/WAVE file.", 415)
+    pos, fmt = 12, None
+    while pos + 8 <= len(head):
+        cid, size = head[pos:pos + 4], struct.unpack_from("<I", head, pos + 4)[0]
+        body = pos + 8
+        if cid == b"fmt ":
+            if body + 16 > len(head):
+                return None
+            _tag, ch, sr, byte_rate, _align, bits = struct.unpack_from("<HHIIHH", head, body)
+            if not (ch and sr and byte_rate):
+                raise UploadRejected("Corrupt WAV fmt chunk.")
+            fmt = (ch, sr, bits, byte_rate)
+        elif cid == b"data":
+            if fmt is None:
+                raise UploadRejected("WAV data chunk precedes fmt chunk.")
+            data_bytes = None if size in (0, 0xFFFFFFFF) else size
+            return WavHeader(*fmt, data_offset=body, data_bytes=data_bytes)
+        pos = body + size + (size & 1)            # chunks are word-aligned
+    return None
+
+async def stream_upload(upload, dest: Path, *, require_wav: bool = True,
+                        max_bytes: int = MAX_UPLOAD_MB * 2**20,
+                        max_duration_s: float = MAX_UPLOAD_S,
+                        chunk_size: int = 256 * 1024) -> Upload:
+    """
+    Copy an async-readable upload (e.g. FastAPI's UploadFile) to `dest` chunk
+    by chunk.  The WAV header is validated from the first bytes and size /
+    duration limits are enforced as soon as they can be known, so peak memory
+    is one chunk regardless of upload size.
+    """
+    sha, size, head, wav = hashlib.sha256(), 0, b"", None
+    fh = await asyncio.to_thread(open, dest, "wb")
+    try:
+        while chunk := await upload.read(chunk_size):
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadRejected(f"Upload exceeds {max_bytes // 2**20} MB.", 413)
+
+            if wav is None and len(head) < _HEADER_MAX:
+                head += chunk[:_HEADER_MAX - len(head)]
+                if head[:4] == b"RIFF" or require_wav:
+                    wav = parse_wav_header(head)
+                    if wav is None and len(head) >= _HEADER_MAX:
+                        raise UploadRejected("WAV header too large or missing data chunk.")
+                    if wav and wav.duration_s is not None and wav.duration_s > max_duration_s:
+                        raise UploadRejected(
+                            f"Audio is {wav.duration_s:.0f}s; limit is {max_duration_s:.0f}s.", 413)
+            if wav is not None and (size - wav.data_offset) / wav.byte_rate > max_duration_s:
+                raise UploadRejected(f"Audio exceeds {max_duration_s:.0f}s.", 413)
+
+            sha.update(chunk)
+            await asyncio.to_thread(fh.write, chunk)
+        if require_wav and wav is None:
+            raise UploadRejected("Truncated or empty WAV upload.")
+    except BaseException:
+        fh.close()
+        dest.unlink(missing_ok=True)
+        raise
+    fh.close()
+    return Upload(path=dest, sha256=sha.hexdigest(), size=size, wav=wav)
@@ -0,0 +1,94 @@
+# speech_compare/language.py
+"""
+Language-metrics engine
+-----------------------
+Every language metric is a function of the token stream alone – word and
+hedge counts, type/token ratio, Flesch-Kincaid grade – so spaCy only has
+to tokenize.  By default that is a blank English pipeline (identical
+tokenizer rules, no weights, no vectors); a trained model can be chosen
+with SPACY_MODEL and is loaded with all of its components excluded.
+
+    language_metrics(text, duration_s)                 -> dict
+    language_metrics_many(texts, durations, n_process) -> [dict]  (nlp.pipe)
+
+All metrics are computed in one walk over the tokens; syllable counts
+(for the readability grade) are memoised per word.
+"""
+
+from __future__ import annotations
+import functools
+from typing import Iterable, Sequence
+
+from app.config import SPACY_MODEL, LANG_N_PROCESS
+from app.ml.registry import registry
+
+HEDGES = frozenset({"just", "maybe", "kind", "sort"})
+# everything a trained English pipeline may ship – none of it is needed
+UNUSED_PIPES = ["tok2vec", "transformer", "tagger", "morphologizer", "parser", "senter",
+                "attribute_ruler", "lemmatizer", "ner", "textcat", "entity_ruler"]
+TERMINALS = frozenset(".!?")
+
+
+def load_nlp(model: str = SPACY_MODEL):
+    """`blank:<lang>` → tokenizer only; anything else → spacy.load minus its components."""
+    import spacy
+    if model.startswith("blank:"):
+        return spacy.blank(model.split(":", 1)[1])
+    return spacy.load(model, exclude=UNUSED_PIPES)
+
+
+def nlp():
+    """Shared tokenizer pipeline, loaded on first use."""
+    return registry.get(f"spacy:{SPACY_MODEL}", load_nlp)
+
+
+@functools.lru_cache(maxsize=65536)
+def _syllables(word: str) -> int:
+    import textstat
+    return max(textstat.syllable_count(word), 1)
+
+
+def doc_metrics(doc, duration_s: float) -> dict:
+    """Word/hedge counts, TTR and Flesch-Kincaid from one pass over `doc`."""
+    words = hedges = syllables = sentences = 0
+    types: set[str] = set()
+    in_sentence = False
+    for tok in doc:
+        if not (tok.is_alpha or tok.like_num):     # punctuation, spaces, clitics ('s, n't)
+            if in_sentence and tok.is_punct and set(tok.text) <= TERMINALS:
+                sentences += 1
+                in_sentence = False
+            continue
+        lower = tok.lower_
+        words += 1
+        types.add(lower)
+        hedges += lower in HEDGES
+        syllables += _syllables(lower)
+        in_sentence = True
+    sentences += in_sentence                       # unterminated last sentence
+
+    minutes = max(duration_s / 60.0, 1e-6)
+    grade = (0.39 * words / sentences + 11.8 * syllables / words - 15.59) if words else 0.0
+    return {
+        "words": words,
+        "wpm": words / minutes,
+        "ttr": len(types) / words if words else 0.0,
+        "flesch_kincaid": round(grade, 2),
+        "sentiment": doc._.polarity if doc.has_extension("polarity") else 0,
+        "hedge_pct": hedges / max(words, 1),
+    }
+
+
+def language_metrics(text: str, duration_s: float) -> dict:
+    return doc_metrics(nlp()(text), duration_s)
+
+
+def language_metrics_many(texts: Iterable[str], durations: Sequence[float],
+                          n_process: int = LANG_N_PROCESS, batch_size: int = 64) -> list[dict]:
+    """Batched language_metrics for a cohort of transcripts.
+
+    `n_process` > 1 forks spaCy workers; keep it at 1 inside processes that
+    are themselves pool workers (daemonic processes cannot have children).
+    """
+    docs = nlp().pipe(texts, n_process=n_process, batch_size=batch_size)
+    return [doc_metrics(doc, d) for doc, d in zip(docs, durations)]
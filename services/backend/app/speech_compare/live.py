@@ -0,0 +1,183 @@
+# speech_compare/live.py
+"""
+Real-time coaching on a PCM stream
+----------------------------------
+LiveCoach is fed raw PCM chunks (the /ws/coach WebSocket) and, every
+`hop_ms`, returns a snapshot of windowed metrics plus deltas against the
+persona's precomputed prosody.
+
+State is a handful of fixed-size ring buffers, so the cost of a chunk is
+independent of how long the session has been running:
+
+• intensity: one dB value per 10 ms frame, computed from the new samples
+  only
+• pitch:     Praat runs on the samples since the last hop plus 100 ms of
+  context (never more than MAX_PITCH_SPAN_S), one F0 value per frame
+• pauses / rate: derived from the last `window_s` of frames at snapshot
+  time (a few hundred numbers)
+
+"wpm" follows the persona catalogue's definition (voiced runs per minute,
+see ml/style.extract), so the speech_rate delta compares like with like.
+"""
+
+from __future__ import annotations
+import time
+
+import numpy as np
+
+from app.config import PAUSE_THRESH_S, SAMPLE_RATE, LIVE_WINDOW_S, LIVE_HOP_MS
+from app.speech_compare.acoustics import PITCH_TIME_STEP, PITCH_FLOOR, PITCH_CEILING
+from app.utils.metrics import metrics
+
+FRAME_S          = PITCH_TIME_STEP   # one intensity / F0 value per 10 ms
+PITCH_CONTEXT_S  = 0.1               # lead-in so the first new frames have full analysis windows
+MAX_PITCH_SPAN_S = 1.0               # cap on new audio per pitch pass (huge chunks → tail only)
+SILENCE_BELOW_DB = 16                # like ingest: silence < mean level − 16 dB
+VOICED_TOP_DB    = 60                # like librosa.effects.split in style.extract
+
+
+class RingBuffer:
+    """Fixed-capacity numpy ring; `latest()` returns the newest values in order."""
+
+    def __init__(self, capacity: int, dtype=np.float32) -> None:
+        self.buf = np.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+        self.size = 0
+        self.pos = 0                      # next write index
+        self.total = 0                    # values ever written
+
+    def extend(self, values) -> None:
+        values = np.asarray(values, dtype=self.buf.dtype)
+        self.total += len(values)
+        values = values[-self.capacity:]
+        n, end = len(values), self.pos + len(values)
+        if end <= self.capacity:
+            self.buf[self.pos:end] = values
+        else:
+            k = self.capacity - self.pos
+            self.buf[self.pos:] = values[:k]
+            self.buf[:n - k] = values[k:]
+        self.pos = end % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def latest(self, n: int | None = None) -> np.ndarray:
+        n = self.size if n is None else min(n, self.size)
+        start = (self.pos - n) % self.capacity
+        if start + n <= self.capacity:
+            return self.buf[start:start + n].copy()
+        return np.concatenate([self.buf[start:], self.buf[:self.pos]])
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """Lengths of the True runs in a boolean array."""
+    padded = np.concatenate([[False], mask, [False]]).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return edges[1::2] - edges[::2]
+
+
+class LiveCoach:
+    def __init__(self, persona_prosody: dict, sample_rate: int = SAMPLE_RATE,
+                 window_s: float = LIVE_WINDOW_S, hop_ms: float = LIVE_HOP_MS) -> None:
+        self.persona = persona_prosody
+        self.sr = sample_rate
+        self.window_s = window_s
+        self.frame = max(int(sample_rate * FRAME_S), 1)
+        self.hop = int(sample_rate * hop_ms / 1000)
+        self.context = int(sample_rate * PITCH_CONTEXT_S)
+
+        n_frames = int(round(window_s / FRAME_S))
+        self.audio = RingBuffer(int(sample_rate * MAX_PITCH_SPAN_S) + self.context)
+        self.db = RingBuffer(n_frames)
+        self.f0 = RingBuffer(n_frames)                   # 0 = unvoiced
+        self._partial = np.empty(0, dtype=np.float32)    # < one frame, carried over
+        self._odd = b""                                  # half a PCM16 sample, carried over
+        self._unpitched = 0
+        self._since_emit = 0
+
+    @property
+    def elapsed_s(self) -> float:
+        return self.audio.total / self.sr
+
+    # ------------------------------------------------------------------ #
+    def feed_pcm16(self, data: bytes) -> dict | None:
+        """Frames may split a sample; the odd byte waits for the next frame."""
+        data = self._odd + data
+        n = len(data) & ~1
+        self._odd = data[n:]
+        return self.feed(np.frombuffer(data[:n], dtype="<i2").astype(np.float32) / 32768.0)
+
+    def feed(self, samples: np.ndarray) -> dict | None:
+        """Add samples; returns a snapshot once per hop, else None."""
+        t0 = time.perf_counter()
+        self.audio.extend(samples)
+        self._unpitched += len(samples)
+        self._since_emit += len(samples)
+
+        # intensity frames – only the tail the window can still hold
+        tail = samples[-self.db.capacity * self.frame:]
+        x = np.concatenate([self._partial, tail]) if len(tail) == len(samples) else tail
+        n = len(x) // self.frame * self.frame
+        frames = x[:n].reshape(-1, self.frame)
+        self._partial = x[n:]
+        rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+        self.db.extend(20 * np.log10(np.maximum(rms, 1e-10)))
+
+        if self._since_emit < self.hop:
+            return None
+        self._since_emit = 0
+        self._pitch_pass()
+        snap = self.snapshot()
+        metrics.observe("live.update_ms", (time.perf_counter() - t0) * 1000)
+        return snap
+
+    def _pitch_pass(self) -> None:
+        import parselmouth
+        new = min(self._unpitched, self.audio.capacity - self.context)
+        self._unpitched = 0
+        seg = self.audio.latest(new + self.context)
+        try:
+            pitch = parselmouth.Sound(seg.astype(np.float64), sampling_frequency=self.sr).to_pitch_ac(
+                time_step=PITCH_TIME_STEP, pitch_floor=PITCH_FLOOR, pitch_ceiling=PITCH_CEILING)
+        except parselmouth.PraatError:                   # too short for one analysis window
+            return
+        fresh = pitch.xs() >= (len(seg) - new) / self.sr
+        self.f0.extend(pitch.selected_array["frequency"][fresh])
+
+    # ------------------------------------------------------------------ #
+    def snapshot(self) -> dict:
+        db, f0 = self.db.latest(), self.f0.latest()
+        voiced = f0[f0 > 0]
+        window_s = len(db) * FRAME_S
+
+        level = 10 * np.log10(np.mean(10 ** (db / 10))) if len(db) else -200.0
+        silent = db < level - SILENCE_BELOW_DB
+        pauses = _runs(silent) * FRAME_S
+        pauses = pauses[pauses >= PAUSE_THRESH_S]
+        voiced_runs = len(_runs(db > db.max() - VOICED_TOP_DB)) if len(db) else 0
+        wpm = voiced_runs / max(window_s / 60, 1e-6)
+
+        pitch = float(np.median(voiced)) if voiced.size else None
+        snap = {
+            "type"          : "metrics",
+            "t_s"           : round(self.elapsed_s, 3),
+            "window_s"      : round(window_s, 2),
+            "pitch_hz"      : pitch,
+            "pitch_iqr_hz"  : float(np.subtract(*np.percentile(voiced, [75, 25]))) if voiced.size else None,
+            "intensity_db"  : float(level),
+            "pause_count"   : int(pauses.size),
+            "pause_ratio"   : float(pauses.sum() / window_s) if window_s else 0.0,
+            "wpm"           : float(wpm),
+        }
+        snap["delta"] = self._delta(pitch, wpm)
+        return snap
+
+    def _delta(self, pitch: float | None, wpm: float) -> dict:
+        """Same ratios as utils.scoring.compare (capped at 2.0), plus the raw pitch gap."""
+        p_pitch, p_wpm = self.persona.get("mean_pitch"), self.persona.get("wpm")
+        delta: dict = {}
+        if pitch is not None and p_pitch:
+            delta["pitch_hz"] = pitch - p_pitch
+            delta["pitch_match"] = min(pitch / p_pitch, 2.0)
+        if p_wpm:
+            delta["speech_rate"] = min(wpm / p_wpm, 2.0)
+        return delta
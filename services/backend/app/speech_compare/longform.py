@@ -0,0 +1,216 @@
+# speech_compare/longform.py
+"""
+Long-form analysis
+------------------
+load_clean + one Praat Sound + one transcriber call hold the whole clip in
+memory several times over; for an hour-long talk that is gigabytes.  Here
+the recording is streamed from ffmpeg and analysed in overlapping windows,
+so memory is one window (LONGFORM_WINDOW_S) plus small running state:
+
+    longform_metrics(path) -> same keys as user_stages()["metrics"]
+
+• level:   a first streaming pass finds the peak and mean level, which
+           ingest's normalisation and silence threshold are defined on
+• pauses:  SilenceTracker is vad.silent_ranges run incrementally over the
+           decoded blocks (no overlap needed, exact same silences)
+• windows: WINDOW_S long, consecutive windows share OVERLAP_S.  Each window
+           owns the "core" between the midpoints of its overlaps; pitch
+           frames and transcribed words are kept only by the window that
+           owns their time, so nothing is counted twice and no boundary
+           frame is analysed without context
+• merge:   F0 goes into a LogHistogram per window (utils/sketch.py) and the
+           sketches are merged – mean and IQR without keeping the values;
+           jitter / shimmer are averaged weighted by owned voiced frames;
+           timing and language metrics run on the merged transcript
+
+Windows are transcribed as recorded (not silence-trimmed), so timestamps
+are already on the source timeline.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+
+import numpy as np
+
+from app.config import (SAMPLE_RATE, PAUSE_THRESH_S, LONGFORM_MIN_S, LONGFORM_WINDOW_S,
+                        LONGFORM_OVERLAP_S)
+from app.speech_compare.acoustics import Acoustics, PITCH_FLOOR, PITCH_CEILING
+from app.speech_compare.features import language_metrics, pause_metrics
+from app.speech_compare.timing import timing_metrics
+from app.utils.audio import AudioBuffer, AudioLike, iter_pcm, probe_duration
+from app.utils.sketch import LogHistogram
+
+KEEP_SILENCE_MS = 100        # ingest.load_clean's padding around kept speech
+
+
+def is_longform(audio: AudioLike, min_s: float = LONGFORM_MIN_S) -> bool:
+    """Undecoded files longer than `min_s` take the windowed path."""
+    return not isinstance(audio, AudioBuffer) and probe_duration(audio) > min_s
+
+
+class SilenceTracker:
+    """vad.silent_ranges over a stream: same 1 ms frames, windows and merging."""
+
+    def __init__(self, sample_rate: int, min_silence_ms: int, silence_thresh_db: float) -> None:
+        self.spm = sample_rate // 1000
+        self.w = min_silence_ms
+        self.limit = 10 ** (silence_thresh_db / 10) * min_silence_ms * self.spm   # window energy
+        self.rest = np.empty(0, dtype=np.float32)    # samples short of a full 1 ms frame
+        self.tail = np.empty(0)                      # energies of the last w-1 frames
+        self.n_ms = 0
+        self.run: tuple[int, int] | None = None      # open silence: (first, last) window start
+        self.silences: list[tuple[int, int]] = []
+
+    def feed(self, samples: np.ndarray) -> None:
+        x = np.concatenate([self.rest, samples])
+        n = len(x) // self.spm
+        self.rest = x[n * self.spm:]
+        frames = x[:n * self.spm].astype(np.float64).reshape(n, self.spm)
+        energy = np.concatenate([self.tail, np.square(frames).sum(axis=1)])
+        base = self.n_ms - len(self.tail)            # frame index of energy[0]
+        self.n_ms += n
+        self.tail = energy[-(self.w - 1):] if self.w > 1 else energy[:0]
+        if len(energy) < self.w:
+            return
+        csum = np.concatenate([[0.0], np.cumsum(energy)])
+        starts = np.flatnonzero(csum[self.w:] - csum[:-self.w] <= self.limit) + base
+        if not starts.size:
+            return
+        breaks = np.flatnonzero(np.diff(starts) > self.w)
+        first = np.concatenate([[starts[0]], starts[breaks + 1]])
+        last = np.concatenate([starts[breaks], [starts[-1]]])
+        if self.run is not None and first[0] - self.run[1] <= self.w:
+            first[0] = self.run[0]                   # continues the open silence
+        elif self.run is not None:
+            self._close(self.run)
+        for f, l in zip(first[:-1], last[:-1]):
+            self._close((f, l))
+        self.run = (int(first[-1]), int(last[-1]))
+
+    def _close(self, run: tuple[int, int]) -> None:
+        self.silences.append((int(run[0]), int(run[1]) + self.w))
+
+    def finish(self) -> tuple[list[tuple[float, float]], float]:
+        """(inner pauses in seconds, duration load_clean would keep)."""
+        if round((self.n_ms * self.spm + len(self.rest)) / self.spm) > self.n_ms:
+            self.feed(np.zeros(self.spm - len(self.rest), dtype=np.float32))   # vad.fit_ms
+        if self.run is not None:
+            self._close(self.run)
+            self.run = None
+        if self.silences and self.silences[0] == (0, self.n_ms):
+            return [], 0.0                           # nothing but silence
+        pauses, cut_ms = [], 0
+        for a, b in self.silences:
+            edge = a == 0 or b == self.n_ms
+            cut_ms += max(b - a - (1 if edge else 2) * KEEP_SILENCE_MS, 0)
+            if not edge:
+                pauses.append((a / 1000, b / 1000))
+        return pauses, (self.n_ms - cut_ms) / 1000
+
+
+def _level(path: Path, sample_rate: int) -> tuple[float, float]:
+    """Peak and dBFS of the whole recording, one block at a time."""
+    peak, energy, n = 0.0, 0.0, 0
+    for block in iter_pcm(path, sample_rate):
+        peak = max(peak, float(np.abs(block).max(initial=0.0)))
+        energy += float(np.square(block, dtype=np.float64).sum())
+        n += len(block)
+    rms = np.sqrt(energy / n) if n else 0.0
+    return peak, (20 * np.log10(rms) if rms > 0 else -np.inf)
+
+
+def _own_words(segments: list[dict], offset: float, lo: float, hi: float) -> list[dict]:
+    """Shift to the source timeline and keep only what falls in [lo, hi)."""
+    owned = []
+    for seg in segments:
+        seg = dict(seg, start=seg["start"] + offset, end=seg["end"] + offset)
+        words = [dict(w, start=w["start"] + offset, end=w["end"] + offset)
+                 for w in seg.get("words", ())
+                 if w.get("start") is not None and w.get("end") is not None]
+        if words:                                    # split at word level
+            words = [w for w in words if lo <= (w["start"] + w["end"]) / 2 < hi]
+            if words:
+                owned.append(dict(seg, start=words[0]["start"], end=words[-1]["end"], words=words,
+                                  text=" ".join(w["word"].strip() for w in words)))
+        elif lo <= (seg["start"] + seg["end"]) / 2 < hi:
+            owned.append(seg)
+    return owned
+
+
+def _analyze_window(samples: np.ndarray, sample_rate: int, offset: float, lo: float,
+                    hi: float, transcribe) -> dict:
+    ac = Acoustics(AudioBuffer(samples, sample_rate).to_sound())
+    times = ac.pitch.xs() + offset
+    f0 = ac.pitch.selected_array["frequency"]
+    owned = f0[(times >= lo) & (times < hi) & (f0 > 0)]
+    sketch = LogHistogram(PITCH_FLOOR, PITCH_CEILING)
+    sketch.add(owned)
+    jitter = shimmer = float("nan")
+    if owned.size:
+        jitter, shimmer = ac.jitter_local(), ac.shimmer_local()
+    return {"pitch": sketch, "weight": int(owned.size), "jitter": jitter, "shimmer": shimmer,
+            "segments": _own_words(transcribe(AudioBuffer(samples, sample_rate)), offset, lo, hi)}
+
+
+def _weighted(values: list[float], weights: list[int]) -> float:
+    v, w = np.asarray(values, dtype=float), np.asarray(weights, dtype=float)
+    ok = np.isfinite(v) & (w > 0)
+    return float(np.average(v[ok], weights=w[ok])) if ok.any() else float("nan")
+
+
+def longform_metrics(path: Path | str, transcribe=None, progress=None,
+                     sample_rate: int = SAMPLE_RATE, window_s: float = LONGFORM_WINDOW_S,
+                     overlap_s: float = LONGFORM_OVERLAP_S) -> dict:
+    """user_stages() metrics for a recording of any length, window by window.
+
+    `transcribe(AudioBuffer) -> segments` defaults to the shared transcriber;
+    `progress(fraction)` is called after each window.
+    """
+    if transcribe is None:
+        from app.speech_compare.transcribe import get_transcriber
+        transcribe = lambda audio: get_transcriber().transcribe(audio)["segments"]
+    progress = progress or (lambda fraction: None)
+    total_s = max(probe_duration(path), 1e-6)
+
+    peak, level_db = _level(path, sample_rate)
+    gain = 10 ** (-0.1 / 20) / peak if peak else 1.0          # vad.normalize
+    tracker = SilenceTracker(sample_rate, int(PAUSE_THRESH_S * 1000), level_db - 16)
+
+    win, ov = int(window_s * sample_rate), int(overlap_s * sample_rate)
+    hop = win - ov
+    pitch = LogHistogram(PITCH_FLOOR, PITCH_CEILING)
+    weights, jitters, shimmers, segments = [], [], [], []
+
+    def consume(samples: np.ndarray, start: int, last: bool) -> None:
+        offset = start / sample_rate
+        lo = 0.0 if start == 0 else offset + overlap_s / 2
+        hi = np.inf if last else offset + overlap_s / 2 + hop / sample_rate
+        res = _analyze_window(samples * gain, sample_rate, offset, lo, hi, transcribe)
+        pitch.merge(res["pitch"])
+        weights.append(res["weight"])
+        jitters.append(res["jitter"])
+        shimmers.append(res["shimmer"])
+        segments.extend(res["segments"])
+        progress(min((start + len(samples)) / sample_rate / total_s, 1.0))
+
+    buf, start = np.empty(0, dtype=np.float32), 0
+    for block in iter_pcm(path, sample_rate):
+        tracker.feed(block)
+        buf = np.concatenate([buf, block])
+        while len(buf) >= win:
+            consume(buf[:win], start, last=False)
+            buf, start = buf[hop:], start + hop
+    if start == 0 or len(buf) > ov // 2:                       # samples no core owns yet
+        consume(buf, start, last=True)
+
+    pauses, kept_s = tracker.finish()
+    prosody = {
+        "duration_s"    : kept_s,
+        "mean_pitch_Hz" : pitch.mean(),
+        "pitch_IQR_Hz"  : pitch.quantile(0.75) - pitch.quantile(0.25),
+        "jitter_local"  : _weighted(jitters, weights),
+        "shimmer_local" : _weighted(shimmers, weights),
+    }
+    text = " ".join(seg["text"] for seg in segments)
+    return (prosody | language_metrics(text, kept_s)
+            | pause_metrics(pauses, tracker.n_ms / 1000) | timing_metrics(segments))
@@ -1,22 +1,23 @@
 # speech_compare/main.py
 import argparse, pandas as pd
 from pathlib import Path
-from app.speech_compare.ingest import preprocess
-from app.speech_compare.transcribe import get_transcriber
+from app.speech_compare.ingest import load_clean
+from app.speech_compare.transcribe import get_transcriber, benchmark
 from app.speech_compare.features import prosody_metrics, language_metrics, save_metrics
-from app.speech_compare.compare import diff
-from app.speech_compare.coach import advise
+from app.speech_compare.compare import diff, top_gaps
+from app.speech_compare.coach import get_coach
 from app.speech_compare.report import render
+from app.speech_compare.batch import run_batch
 from app.config import DATA_DIR
 
-def run(user_raw: Path, persona_raw: Path):
+def run(user_raw: Path, persona_raw: Path, coach: str = "openai"):
     DATA_DIR.mkdir(exist_ok=True)
-    user_wav    = preprocess(user_raw)
-    persona_wav = preprocess(persona_raw)
+    user_wav    = load_clean(user_raw)       # in-memory buffers, no *_clean.wav files
+    persona_wav = load_clean(persona_raw)
 
     transcriber = get_transcriber()
-    u_text = transcriber.transcribe(user_wav)["text"]
-    p_text = transcriber.transcribe(persona_wav)["text"]
+    u_text = " ".join(seg["text"] for seg in transcriber.transcribe(user_wav)["segments"])
+    p_text = " ".join(seg["text"] for seg in transcriber.transcribe(persona_wav)["segments"])
     
     u_pros = prosody_metrics(user_wav)
     u_lang = language_metrics(u_text, u_pros["duration_s"])
@@ -30,15 +31,46 @@ def run(user_raw: Path, persona_raw: Path):
     save_metrics(DATA_DIR/"persona.json", p_metrics)
 
     delta = diff(u_metrics, p_metrics)
-    gaps  = delta.loc["user"] - delta.loc["persona"]
-    tips  = advise(gaps.nlargest(3).to_dict())
+    tips  = get_coach(coach).advise(top_gaps(delta))
 
     render(delta, tips, out_name="speech_report")
     print("✅ Report written to reports/speech_report.html")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--user", required=True,  help="path to user's audio")
-    parser.add_argument("--persona", required=True, help="path to persona audio")
-    run(**vars(parser.parse_args()))
+    parser.add_argument("--user",    type=Path, help="path to user's audio")
+    parser.add_argument("--persona", type=Path, help="path to persona audio")
+    parser.add_argument("--coach",   default="openai")
 
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--batch", type=Path,
+                       help="directory of clips, or manifest (.csv with path[,persona] / .txt)")
+    batch.add_argument("--personas", default="",
+                       help="comma-separated persona ids (default: every persona)")
+    batch.add_argument("--out", type=Path, default=DATA_DIR / "batch" / "results.csv",
+                       help="results file (.csv or .parquet); re-running resumes it")
+    batch.add_argument("--workers", type=int, default=2)
+    batch.add_argument("--chunk-size", type=int, default=8,
+                       help="clips per worker task / transcription batch")
+    batch.add_argument("--transcriber", default=None,
+                       help="STT backend (default: STT_BACKEND)")
+
+    bench = parser.add_argument_group("STT benchmark")
+    bench.add_argument("--bench-stt", type=Path, metavar="AUDIO",
+                       help="compare real-time factor of the transcriber backends on AUDIO")
+    bench.add_argument("--backends", default="",
+                       help="comma-separated backends to benchmark (default: all)")
+    args = parser.parse_args()
+
+    if args.bench_stt:
+        rows = benchmark(args.bench_stt, [b for b in args.backends.split(",") if b] or None)
+        print(pd.DataFrame(rows).to_string(index=False))
+    elif args.batch:
+        run_batch(args.batch, args.out,
+                  personas=[p for p in args.personas.split(",") if p] or None,
+                  workers=args.workers, chunk_size=args.chunk_size,
+                  transcriber=args.transcriber)
+    elif args.user and args.persona:
+        run(args.user, args.persona, coach=args.coach)
+    else:
+        parser.error("either --user and --persona, or --batch is required")
@@ -0,0 +1,103 @@
+# speech_compare/persona_features.py
+"""
+Versioned per-persona feature store
+-----------------------------------
+Personas never change between requests, so their cleaned audio, WhisperX
+segments and full metrics dict are computed once (see
+scripts/build_persona_features.py) and read back by run_pipeline.
+
+Layout::
+
+    PERSONA_FEATURE_DIR/v<FEATURE_VERSION>/<persona_id>.json
+    PERSONA_FEATURE_DIR/v<FEATURE_VERSION>/<persona_id>_clean.wav
+
+Bump FEATURE_VERSION whenever preprocessing or a metric definition
+changes; old versions are simply ignored.  Records also name the spaCy
+model and transcriber fingerprint they were built with, and are treated as
+stale when either differs from the running config.
+"""
+
+from __future__ import annotations
+import functools, json, os
+from pathlib import Path
+
+from app.config import PERSONA_FEATURE_DIR
+from app.utils.cache import sha256_file
+from app.speech_compare.ingest import load_clean
+from app.speech_compare.transcribe import get_transcriber, fingerprint
+from app.speech_compare.features import prosody_metrics, language_metrics, pause_metrics
+from app.speech_compare.timing import timing_metrics
+from app.speech_compare import language
+
+FEATURE_VERSION = 6
+
+
+def store_dir(version: int = FEATURE_VERSION) -> Path:
+    return PERSONA_FEATURE_DIR / f"v{version}"
+
+
+@functools.lru_cache(maxsize=1024)
+def _digest(path: str, mtime_ns: int, size: int) -> str:
+    return sha256_file(Path(path))
+
+
+def source_sha256(wav_path: Path) -> str:
+    """sha256 of a persona clip, re-hashed only when its mtime or size changes."""
+    st = os.stat(wav_path)
+    return _digest(str(Path(wav_path).resolve()), st.st_mtime_ns, st.st_size)
+
+
+def build(persona_id: str, wav_path: Path) -> dict:
+    """Analyse one persona clip and persist the result."""
+    out_dir = store_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    audio    = load_clean(wav_path)                 # decoded once, reused by every stage
+    clean    = audio.write(out_dir / f"{persona_id}_clean.wav")
+    segments = get_transcriber().transcribe(audio)["segments"]
+    text     = " ".join(seg["text"] for seg in segments)
+    pros     = prosody_metrics(audio)
+
+    record = {
+        "version"      : FEATURE_VERSION,
+        "persona_id"   : persona_id,
+        "source_sha256": source_sha256(wav_path),
+        "spacy_model"  : language.SPACY_MODEL,
+        "transcriber"  : fingerprint(),
+        "clean_wav"    : clean.name,
+        "segments"     : segments,
+        "text"         : text,
+        "metrics"      : pros | language_metrics(text, pros["duration_s"])
+                         | pause_metrics(audio.meta["pauses"], audio.meta["raw_duration_s"])
+                         | timing_metrics(segments, audio.meta["kept_s"]),
+    }
+    # write-then-rename so a concurrent reader never sees half a file
+    dest = out_dir / f"{persona_id}.json"
+    tmp  = dest.with_suffix(f".json.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(record, default=float))
+    os.replace(tmp, dest)
+    return record
+
+
+def load(persona_id: str, wav_path: Path | None = None) -> dict | None:
+    """Stored record, or None if missing / stale against `wav_path`."""
+    path = store_dir() / f"{persona_id}.json"
+    if not path.exists():
+        return None
+    record = json.loads(path.read_text())
+    if (record.get("version") != FEATURE_VERSION or record.get("spacy_model") != language.SPACY_MODEL
+            or record.get("transcriber") != fingerprint()):
+        return None
+    if wav_path is not None and record["source_sha256"] != source_sha256(wav_path):
+        return None
+    record["clean_wav"] = store_dir() / record["clean_wav"]
+    return record
+
+
+def get(persona_id: str, wav_path: Path) -> dict:
+    """Read-through: load the stored record, building it on a miss."""
+    record = load(persona_id, wav_path)
+    if record is None:
+        build(persona_id, wav_path)
+        record = load(persona_id)
+    return record
@@ -1,15 +1,92 @@
 # speech_compare/report.py
-import plotly.express as px, pandas as pd, jinja2, base64, io
+"""
+Report engine
+-------------
+No headless browser: the radar chart is an inline SVG built from strings,
+so a report renders in a few milliseconds (pandas' to_html is most of it).
+
+• REPORT_DIR/template.html is compiled once per process by a jinja2
+  Environment; auto_reload re-compiles only when the file's mtime changes
+• each radar axis is user / persona, capped at 2.0 like scoring.compare, so
+  the persona polygon always sits on the middle ring.  Grid, labels and
+  persona polygon depend only on the persona's metrics and are cached
+  (`_persona_layer`); per report only the user polygon is drawn
+
+Template variables: `table` (HTML), `tips`, `radar` (an SVG data URI, so
+an existing `<img src="{{ radar }}">` keeps working) and `radar_svg`
+(the same chart for inlining).
+"""
+
+import base64, functools, math, time
+from html import escape
+
+import jinja2, pandas as pd
+
 from app.config import REPORT_DIR
+from app.speech_compare.compare import chart_rows
+from app.utils.metrics import metrics
+
+SIZE       = 420          # px, square canvas
+RADIUS     = 140          # px, ratio 2.0
+MAX_RATIO  = 2.0
+RINGS      = (0.5, 1.0, 1.5, 2.0)
+
+_env = jinja2.Environment(loader=jinja2.FileSystemLoader(REPORT_DIR), auto_reload=True)
+
+
+def _xy(i: int, n: int, ratio: float) -> tuple[float, float]:
+    angle = 2 * math.pi * i / n - math.pi / 2              # first axis points up
+    r = RADIUS * min(max(ratio, 0.0), MAX_RATIO) / MAX_RATIO
+    return SIZE / 2 + r * math.cos(angle), SIZE / 2 + r * math.sin(angle)
+
+
+def _polygon(ratios, **attrs) -> str:
+    pts = " ".join("%.1f,%.1f" % _xy(i, len(ratios), r) for i, r in enumerate(ratios))
+    extra = " ".join(f'{k.replace("_", "-")}="{v}"' for k, v in attrs.items())
+    return f'<polygon points="{pts}" {extra}/>'
+
+
+@functools.lru_cache(maxsize=256)
+def _persona_layer(axes: tuple[str, ...], persona: tuple[float | None, ...]) -> str:
+    """Grid, spokes, axis labels and the persona polygon (ratio 1 on every axis)."""
+    n, parts = len(axes), []
+    for ring in RINGS:
+        parts.append(_polygon([ring] * n, fill="none", stroke="#ddd"))
+    for i, (name, value) in enumerate(zip(axes, persona)):
+        x, y = _xy(i, n, MAX_RATIO)
+        lx, ly = _xy(i, n, MAX_RATIO * 1.12)
+        anchor = "middle" if abs(lx - SIZE / 2) < 1 else ("start" if lx > SIZE / 2 else "end")
+        parts.append(f'<line x1="{SIZE / 2}" y1="{SIZE / 2}" x2="{x:.1f}" y2="{y:.1f}" stroke="#ddd"/>')
+        parts.append(f'<text x="{lx:.1f}" y="{ly:.1f}" text-anchor="{anchor}" '
+                     f'dominant-baseline="middle">{escape(name)}'
+                     f'<title>persona: {"n/a" if value is None else f"{value:.4g}"}</title></text>')
+    parts.append(_polygon([1.0] * n, fill="#888", fill_opacity="0.15", stroke="#888",
+                          stroke_dasharray="4 3"))
+    return "".join(parts)
+
+
+def radar_svg(df: pd.DataFrame) -> str:
+    """User vs persona per metric, one axis per `diff()` row."""
+    df = df[["user", "persona"]].apply(pd.to_numeric, errors="coerce")
+    axes = tuple(map(str, df.index))
+    persona = tuple(float(p) if math.isfinite(p) else None for p in df["persona"])   # NaN ≠ NaN as a cache key
+    ratios = [u / p if p and math.isfinite(u) else 0.0 for u, p in zip(df["user"], persona)]
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {SIZE} {SIZE}" '
+            f'width="{SIZE}" height="{SIZE}" font-family="sans-serif" font-size="11" fill="#333">'
+            + _persona_layer(axes, persona)
+            + _polygon(ratios, fill="#1f77b4", fill_opacity="0.35", stroke="#1f77b4",
+                       stroke_width="2")
+            + "</svg>")
+
+
+def _data_uri(svg: str) -> str:
+    return "data:image/svg+xml;base64," + base64.b64encode(svg.encode()).decode()
 
-def _radar(df: pd.DataFrame) -> str:
-    fig = px.line_polar(df.reset_index(), r="user", theta="index",
-                        line_close=True, template="plotly_white")
-    buf = io.BytesIO(); fig.write_image(buf, format="png"); buf.seek(0)
-    return "data:image/png;base64,"+base64.b64encode(buf.read()).decode()
 
 def render(df: pd.DataFrame, suggestions: list[str], out_name: str):
-    template = jinja2.Template((REPORT_DIR/"template.html").read_text())
-    img = _radar(df.drop("score"))
-    html = template.render(table=df.to_html(), radar=img, tips=suggestions)
+    t0 = time.perf_counter()
+    template = _env.get_template("template.html")           # compiled once, cached
+    svg = radar_svg(chart_rows(df))
+    html = template.render(table=df.to_html(), radar=_data_uri(svg), radar_svg=svg, tips=suggestions)
     (REPORT_DIR/f"{out_name}.html").write_text(html)
+    metrics.observe("report.render_ms", (time.perf_counter() - t0) * 1000)
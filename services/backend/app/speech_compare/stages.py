@@ -0,0 +1,99 @@
+# speech_compare/stages.py
+"""
+Tiny stage-DAG runner
+---------------------
+Each Stage names the stages it depends on; their results are passed to it
+as keyword arguments.  Every stage runs exactly once, as soon as its
+inputs are ready, on the pool it asks for – so independent work
+(transcription vs. Praat) overlaps and wall time tracks the critical path.
+
+    run = run_stages({
+        "audio":    Stage(load),
+        "segments": Stage(transcribe, deps=("audio",)),
+        "prosody":  Stage(prosody_metrics, deps=("audio",), pool="process"),
+    })
+    run.results["prosody"], run.timings["segments"]
+"""
+
+from __future__ import annotations
+import threading, time
+from concurrent.futures import (Executor, Future, ProcessPoolExecutor,
+                                ThreadPoolExecutor, FIRST_COMPLETED, wait)
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from app.config import STAGE_THREADS, STAGE_PROCESSES
+
+
+@dataclass
+class Stage:
+    fn: Callable[..., Any]
+    deps: tuple[str, ...] = ()
+    pool: str = "thread"               # "thread" | "process"
+
+
+@dataclass
+class StageRun:
+    results: dict[str, Any] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+    wall_s: float = 0.0
+
+
+_pools: dict[str, Executor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(kind: str) -> Executor:
+    """Shared, lazily created executors (one of each kind per worker process)."""
+    with _pools_lock:
+        if kind not in _pools:
+            if kind == "thread":
+                _pools[kind] = ThreadPoolExecutor(STAGE_THREADS, thread_name_prefix="stage")
+            elif kind == "process":
+                _pools[kind] = ProcessPoolExecutor(STAGE_PROCESSES)
+            else:
+                raise ValueError(f"Unknown pool '{kind}'")
+        return _pools[kind]
+
+
+def shutdown_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _pools.clear()
+
+
+def _timed(fn: Callable[..., Any], kwargs: dict) -> tuple[Any, float]:
+    t0 = time.perf_counter()
+    return fn(**kwargs), time.perf_counter() - t0
+
+
+def run_stages(stages: dict[str, Stage], progress=None) -> StageRun:
+    for name, stage in stages.items():
+        missing = set(stage.deps) - stages.keys()
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown {sorted(missing)}")
+
+    run, t0 = StageRun(), time.perf_counter()
+    pending = dict(stages)
+    running: dict[Future, str] = {}
+    try:
+        while pending or running:
+            for name in [n for n, s in pending.items() if all(d in run.results for d in s.deps)]:
+                stage = pending.pop(name)
+                kwargs = {d: run.results[d] for d in stage.deps}
+                running[get_pool(stage.pool).submit(_timed, stage.fn, kwargs)] = name
+            if not running:
+                raise ValueError(f"Dependency cycle among {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                run.results[name], run.timings[name] = fut.result()   # re-raises stage errors
+                if progress:
+                    progress(name, len(run.results) / len(stages))
+    finally:
+        for fut in running:
+            fut.cancel()
+    run.wall_s = time.perf_counter() - t0
+    return run
@@ -0,0 +1,133 @@
+# speech_compare/timing.py
+"""
+Time-aligned speech-rate features
+---------------------------------
+Speaking rate and pause statistics from the timestamps the transcriber
+already returns – no extra audio pass.
+
+• word timings come from `seg["words"]` when the backend provides them
+  (faster-whisper, aligned WhisperX); otherwise a segment's words are
+  spread evenly over its [start, end]
+• ingest trims long silences before transcription, so timestamps are on
+  the cleaned timeline; with the kept ranges (`audio.meta["kept_s"]`) they
+  are mapped back to the source timeline, where the pauses really are.  A
+  word that crosses a cut (routine for evenly spread words) is split there
+  for the gap statistics, so the removed silence counts as a pause instead
+  of stretching the word
+
+    timing_metrics(segments, kept_s) -> {"speech_rate_wpm", "articulation_wpm",
+                                         "seg_wpm_mean", "rolling_wpm_max", "gap_p90_s", ...}
+"""
+
+from __future__ import annotations
+from typing import Sequence
+
+import numpy as np
+
+from app.config import PAUSE_THRESH_S
+
+ROLLING_WINDOW_S = 10.0
+ROLLING_HOP_S    = 1.0
+LONG_GAP_S       = 1.0
+
+
+def word_times(segments: Sequence[dict]) -> tuple[np.ndarray, np.ndarray]:
+    """(n_words, 2) start/end array, plus the segment index of every word."""
+    times, owner = [], []
+    for i, seg in enumerate(segments):
+        timed = [(w["start"], w["end"]) for w in seg.get("words", ())
+                 if w.get("start") is not None and w.get("end") is not None]
+        if not timed:
+            n = len(seg["text"].split())
+            edges = np.linspace(seg["start"], seg["end"], n + 1)
+            timed = list(zip(edges[:-1], edges[1:]))
+        times += timed
+        owner += [i] * len(timed)
+    return np.asarray(times, dtype=float).reshape(-1, 2), np.asarray(owner, dtype=int)
+
+
+def _kept_range(t: np.ndarray, kept: np.ndarray, side: str) -> tuple[np.ndarray, np.ndarray]:
+    """Index of the kept range each cleaned-timeline time falls in, and its clean start."""
+    clean_start = np.concatenate([[0.0], np.cumsum(kept[:, 1] - kept[:, 0])[:-1]])
+    i = np.clip(np.searchsorted(clean_start, t, side=side) - 1, 0, len(kept) - 1)
+    return i, clean_start[i]
+
+
+def to_source(t: np.ndarray, kept_s: Sequence[tuple[float, float]] | None,
+              side: str = "right") -> np.ndarray:
+    """Map cleaned-timeline seconds back onto the source recording.
+
+    A time exactly on a cut belongs to the range after it; pass side="left"
+    for end times, which belong to the range before it.
+    """
+    if not kept_s:
+        return t
+    kept = np.asarray(kept_s, dtype=float)
+    i, clean_start = _kept_range(t, kept, side)
+    return kept[i, 0] + (t - clean_start)
+
+
+def source_spans(times: np.ndarray, kept_s: Sequence[tuple[float, float]] | None) -> np.ndarray:
+    """Word (start, end) pairs on the source timeline, split wherever a word crosses a cut."""
+    if not kept_s or not len(times):
+        return times
+    kept = np.asarray(kept_s, dtype=float)
+    first, _ = _kept_range(times[:, 0], kept, "right")
+    last, _ = _kept_range(times[:, 1], kept, "left")
+    starts, ends = to_source(times[:, 0], kept_s), to_source(times[:, 1], kept_s, side="left")
+    spans = []
+    for s, e, a, b in zip(starts, ends, first, last):
+        edges = [s] + [x for k in range(a, b) for x in (kept[k, 1], kept[k + 1, 0])] + [e]
+        spans += zip(edges[::2], edges[1::2])
+    return np.asarray(spans, dtype=float).reshape(-1, 2)
+
+
+def _rolling_wpm(mid: np.ndarray, start: float, end: float) -> np.ndarray:
+    if end - start <= ROLLING_WINDOW_S:
+        return np.array([len(mid) / max(end - start, 1e-6) * 60])
+    lo = np.arange(start, end - ROLLING_WINDOW_S + 1e-9, ROLLING_HOP_S)
+    counts = np.searchsorted(mid, lo + ROLLING_WINDOW_S) - np.searchsorted(mid, lo)
+    return counts / ROLLING_WINDOW_S * 60
+
+
+def timing_metrics(segments: Sequence[dict], kept_s: Sequence[tuple[float, float]] | None = None,
+                   pause_s: float = PAUSE_THRESH_S) -> dict:
+    times, owner = word_times(segments)
+    if len(times) == 0:
+        return {k: 0 for k in ("speech_rate_wpm", "articulation_wpm", "seg_wpm_mean",
+                               "seg_wpm_cv", "rolling_wpm_min", "rolling_wpm_max",
+                               "rolling_wpm_sd", "gap_count", "gap_p50_s", "gap_p90_s",
+                               "gap_max_s", "long_gap_count")}
+    spans = source_spans(times, kept_s)
+    mid = to_source(times.mean(axis=1), kept_s)                 # never inside a cut
+    times = np.column_stack([to_source(times[:, 0], kept_s),
+                             to_source(times[:, 1], kept_s, side="left")])
+    start, end = float(times[0, 0]), float(times[-1, 1])
+    span = max(end - start, 1e-6)
+
+    gaps = spans[1:, 0] - spans[:-1, 1]
+    gaps = gaps[gaps >= pause_s]
+    phonation = max(span - gaps.sum(), 1e-6)
+
+    # per segment: its words over its own (source-timeline) extent
+    seg_wpm = []
+    for i in np.unique(owner):
+        t = times[owner == i]
+        seg_wpm.append(len(t) / max(t[-1, 1] - t[0, 0], 1e-6) * 60)
+    seg_wpm = np.asarray(seg_wpm)
+    rolling = _rolling_wpm(np.sort(mid), start, end)
+
+    return {
+        "speech_rate_wpm" : float(len(times) / span * 60),          # pauses included
+        "articulation_wpm": float(len(times) / phonation * 60),     # pauses >= pause_s excluded
+        "seg_wpm_mean"    : float(seg_wpm.mean()),
+        "seg_wpm_cv"      : float(seg_wpm.std() / seg_wpm.mean()) if seg_wpm.mean() else 0.0,
+        "rolling_wpm_min" : float(rolling.min()),
+        "rolling_wpm_max" : float(rolling.max()),
+        "rolling_wpm_sd"  : float(rolling.std()),
+        "gap_count"       : int(gaps.size),
+        "gap_p50_s"       : float(np.median(gaps)) if gaps.size else 0.0,
+        "gap_p90_s"       : float(np.percentile(gaps, 90)) if gaps.size else 0.0,
+        "gap_max_s"       : float(gaps.max()) if gaps.size else 0.0,
+        "long_gap_count"  : int((gaps >= LONG_GAP_S).sum()),
+    }
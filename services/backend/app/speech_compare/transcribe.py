@@ -1,18 +1,199 @@
 # speech_compare/transcribe.py
 from abc import ABC, abstractmethod
-from pathlib import Path
-import whisperx
+import functools, threading, time
+import numpy as np
+from app.config import (SAMPLE_RATE, MODEL_CACHE, STT_BATCH_MAX_ITEMS, STT_BATCH_MAX_WAIT_MS,
+                        STT_BACKEND, STT_MODEL_SIZE, STT_DEVICE, STT_COMPUTE_TYPE, STT_THREADS)
+from app.ml.registry import registry
+from app.utils.audio import AudioBuffer, AudioLike, as_buffer
+from app.speech_compare.batching import MicroBatcher
 
 class AbstractTranscriber(ABC):
+    """Every backend returns {"segments": [{start, end, text[, words]}], "text": str}."""
+
     @abstractmethod
-    def transcribe(self, wav: Path) -> dict: ...
+    def transcribe(self, wav: AudioLike) -> dict: ...
+
+    def transcribe_batch(self, wavs: list[AudioLike]) -> list[dict]:
+        """One result per input; backends override this to batch the forward pass."""
+        return [self.transcribe(w) for w in wavs]
+
+def _input(wav: AudioLike):
+    # Whisper-family models take a 16 kHz float32 array directly – no re-decode
+    return wav.samples if isinstance(wav, AudioBuffer) else str(wav)
+
+def _with_text(result: dict) -> dict:
+    result.setdefault("text", " ".join(seg["text"].strip() for seg in result["segments"]))
+    return result
+
+def _shift(seg: dict, offset: float) -> dict:
+    seg = dict(seg, start=seg["start"] - offset, end=seg["end"] - offset)
+    if "words" in seg:
+        seg["words"] = [dict(w, **{k: w[k] - offset for k in ("start", "end") if k in w})
+                        for w in seg["words"]]
+    return seg
+
+def _resolve(device: str, compute_type: str) -> tuple[str, str]:
+    if device == "auto":
+        try:
+            import torch
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        except ImportError:
+            device = "cpu"
+    if compute_type == "auto":
+        compute_type = "float16" if device == "cuda" else "int8"
+    return device, compute_type
 
+# --------------------------------------------------------------------------- #
+# Backends
+# --------------------------------------------------------------------------- #
 class WhisperXTranscriber(AbstractTranscriber):
-    def __init__(self):
-        self.model = whisperx.load_model("base", device="cuda", download_root=".models")
-    def transcribe(self, wav: Path) -> dict:
-        return self.model.transcribe(str(wav))
-
-def get_transcriber(name="whisperx") -> AbstractTranscriber:
-    if name == "whisperx": return WhisperXTranscriber()
-    raise ValueError(f"Unknown transcriber {name}")
+    # Silence between concatenated clips.  WhisperX merges VAD regions into
+    # windows of at most chunk_size (30 s), so a 30 s gap guarantees no window
+    # ever straddles two clips.
+    BATCH_GAP_S = 30.0
+
+    def __init__(self, model_size: str = STT_MODEL_SIZE, device: str = STT_DEVICE,
+                 compute_type: str = STT_COMPUTE_TYPE, threads: int = STT_THREADS,
+                 batch_size: int = 16):
+        import whisperx
+        device, compute_type = _resolve(device, compute_type)
+        # language pinned: with language=None the pipeline resets its tokenizer
+        # at the end of every transcribe() call, under any concurrent caller
+        self.model = whisperx.load_model(model_size, device=device, compute_type=compute_type,
+                                         language="en", threads=threads,
+                                         download_root=str(MODEL_CACHE))
+        self.batch_size = batch_size
+        self._lock = threading.Lock()             # one shared pipeline; its state isn't thread-safe
+    def transcribe(self, wav: AudioLike) -> dict:
+        with self._lock:
+            return _with_text(self.model.transcribe(_input(wav), batch_size=self.batch_size))
+
+    def transcribe_batch(self, wavs: list[AudioLike]) -> list[dict]:
+        """Several clips through one batched forward pass.
+
+        Clips are laid end to end (separated by BATCH_GAP_S of silence), the
+        whole thing is transcribed once, and segments are routed back to the
+        clip they fall in with their timestamps rebased.
+        """
+        if len(wavs) <= 1:
+            return [self.transcribe(w) for w in wavs]
+        bufs = [as_buffer(w) for w in wavs]
+        gap = np.zeros(int(self.BATCH_GAP_S * SAMPLE_RATE), dtype=np.float32)
+        parts, offsets, t = [], [], 0.0
+        for buf in bufs:
+            offsets.append(t)
+            parts += [buf.samples, gap]
+            t += buf.duration_s + self.BATCH_GAP_S
+        with self._lock:
+            result = self.model.transcribe(np.concatenate(parts[:-1]), batch_size=self.batch_size)
+
+        out = [{"segments": [], "language": result.get("language")} for _ in bufs]
+        starts = np.array(offsets)
+        for seg in result["segments"]:
+            i = max(int(np.searchsorted(starts, seg["start"], side="right")) - 1, 0)
+            out[i]["segments"].append(_shift(seg, offsets[i]))
+        return [_with_text(r) for r in out]
+
+class FasterWhisperTranscriber(AbstractTranscriber):
+    """CTranslate2 inference – int8-quantised weights run well on CPU-only nodes."""
+
+    def __init__(self, model_size: str = STT_MODEL_SIZE, device: str = STT_DEVICE,
+                 compute_type: str = STT_COMPUTE_TYPE, threads: int = STT_THREADS):
+        from faster_whisper import WhisperModel
+        device, compute_type = _resolve(device, compute_type)
+        self.model = WhisperModel(model_size, device=device, compute_type=compute_type,
+                                  cpu_threads=threads, download_root=str(MODEL_CACHE))
+    def transcribe(self, wav: AudioLike) -> dict:
+        segments, info = self.model.transcribe(_input(wav), language="en",
+                                               vad_filter=True, word_timestamps=True)
+        segs = [{"start": s.start, "end": s.end, "text": s.text,
+                 "words": [{"word": w.word, "start": w.start, "end": w.end}
+                           for w in (s.words or [])]}
+                for s in segments]                       # generator → decode happens here
+        return _with_text({"segments": segs, "language": info.language})
+
+class OpenAIWhisperTranscriber(AbstractTranscriber):
+    """Reference fp32/fp16 PyTorch implementation (what ml/stt used to load)."""
+
+    def __init__(self, model_size: str = STT_MODEL_SIZE, device: str = STT_DEVICE,
+                 compute_type: str = STT_COMPUTE_TYPE, threads: int = STT_THREADS):
+        import torch, whisper
+        self.device, _ = _resolve(device, compute_type)
+        torch.set_num_threads(threads)
+        self.model = whisper.load_model(model_size, device=self.device,
+                                        download_root=str(MODEL_CACHE))
+    def transcribe(self, wav: AudioLike) -> dict:
+        result = self.model.transcribe(_input(wav), fp16=self.device == "cuda", language="en")
+        segs = [{"start": s["start"], "end": s["end"], "text": s["text"]} for s in result["segments"]]
+        return {"segments": segs, "text": result["text"].strip(), "language": "en"}
+
+BACKENDS: dict[str, type[AbstractTranscriber]] = {
+    "whisperx"      : WhisperXTranscriber,
+    "faster-whisper": FasterWhisperTranscriber,
+    "ctranslate2"   : FasterWhisperTranscriber,
+    "openai-whisper": OpenAIWhisperTranscriber,
+}
+
+class BatchedTranscriber(AbstractTranscriber):
+    """Funnels concurrent transcribe() calls into inner.transcribe_batch()."""
+    def __init__(self, inner: AbstractTranscriber, name: str,
+                 max_items: int = STT_BATCH_MAX_ITEMS, max_wait_ms: float = STT_BATCH_MAX_WAIT_MS):
+        self.inner = inner
+        self.batcher = MicroBatcher(inner.transcribe_batch, max_items=max_items,
+                                    max_wait_ms=max_wait_ms, name=f"stt.{name}")
+    def transcribe(self, wav: AudioLike) -> dict:
+        return self.batcher(as_buffer(wav))
+    def transcribe_batch(self, wavs: list[AudioLike]) -> list[dict]:
+        return self.inner.transcribe_batch(wavs)
+
+def _build_transcriber(name: str, batched: bool = True, **opts) -> AbstractTranscriber:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcriber {name}")
+    inner = BACKENDS[name](**opts)
+    return BatchedTranscriber(inner, name) if batched and STT_BATCH_MAX_ITEMS > 1 else inner
+
+def get_transcriber(name: str | None = None, **opts) -> AbstractTranscriber:
+    """Shared per-worker instance; the model is only loaded on first use.
+
+    `opts` (model_size, device, compute_type, threads) default to the STT_* config.
+    """
+    name = name or STT_BACKEND
+    key = f"transcriber:{name}:" + ",".join(f"{k}={v!r}" for k, v in sorted(opts.items()))
+    return registry.get(key.rstrip(":"), lambda: _build_transcriber(name, **opts))
+
+@functools.lru_cache(maxsize=None)
+def fingerprint(name: str | None = None) -> str:
+    """Identifies the configured backend in result-cache keys.
+
+    Resolving "auto" imports torch and probes the device, so the answer is
+    computed once per process (warm-up does it before the first request).
+    """
+    device, compute_type = _resolve(STT_DEVICE, STT_COMPUTE_TYPE)
+    return f"{name or STT_BACKEND}:{STT_MODEL_SIZE}:{device}:{compute_type}"
+
+# --------------------------------------------------------------------------- #
+# Benchmark
+# --------------------------------------------------------------------------- #
+def benchmark(audio: AudioLike, backends: list[str] | None = None, repeats: int = 3,
+              **opts) -> list[dict]:
+    """Load time and real-time factor (transcribe time / audio length) per backend."""
+    buf, rows = as_buffer(audio), []
+    for name in backends or ["whisperx", "faster-whisper", "openai-whisper"]:
+        t0 = time.perf_counter()
+        try:
+            model = _build_transcriber(name, batched=False, **opts)
+        except Exception as err:                        # backend not installed / no GPU
+            rows.append({"backend": name, "error": repr(err)})
+            continue
+        load_s = time.perf_counter() - t0
+        model.transcribe(buf)                           # warm-up
+        runs = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            model.transcribe(buf)
+            runs.append(time.perf_counter() - t0)
+        rows.append({"backend": name, "load_s": load_s, "audio_s": buf.duration_s,
+                     "mean_s": float(np.mean(runs)), "rtf": float(np.mean(runs)) / buf.duration_s})
+        del model
+    return rows
@@ -0,0 +1,123 @@
+"""
+In-memory audio
+---------------
+AudioBuffer is a decoded clip (mono float32 in [-1, 1], SAMPLE_RATE by
+default) that every stage accepts directly, so an upload is decoded once
+and handed around as a NumPy array instead of being re-read from disk by
+pydub, Praat, WhisperX, librosa and resemblyzer in turn.
+
+Nothing touches the disk unless `write()` is called.  Recordings too long
+to hold at once are read block by block with `iter_pcm()` instead.
+"""
+
+from __future__ import annotations
+import struct, subprocess, wave
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Union
+
+import numpy as np
+
+from app.config import SAMPLE_RATE
+
+
+@dataclass(frozen=True)
+class AudioBuffer:
+    samples: np.ndarray               # float32, mono, [-1, 1]
+    sample_rate: int = SAMPLE_RATE
+    source: Path | None = None        # where it was decoded from, if anywhere
+    meta: dict = field(default_factory=dict, compare=False)   # e.g. pauses cut by ingest
+
+    @property
+    def duration_s(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    # ---- construction ------------------------------------------------- #
+    @classmethod
+    def from_file(cls, path: Path | str, sample_rate: int = SAMPLE_RATE) -> "AudioBuffer":
+        """Decode any pydub/ffmpeg-readable file once, as mono @ `sample_rate`."""
+        from pydub import AudioSegment
+        seg = AudioSegment.from_file(path).set_frame_rate(sample_rate).set_channels(1)
+        return cls.from_segment(seg, source=Path(path))
+
+    @classmethod
+    def from_segment(cls, seg, source: Path | None = None) -> "AudioBuffer":
+        pcm = np.array(seg.get_array_of_samples())
+        scale = float(1 << (8 * seg.sample_width - 1))
+        return cls(pcm.astype(np.float32) / scale, seg.frame_rate, source)
+
+    @classmethod
+    def from_pcm16(cls, data: bytes, sample_rate: int = SAMPLE_RATE) -> "AudioBuffer":
+        pcm = np.frombuffer(data, dtype="<i2")
+        return cls(pcm.astype(np.float32) / 32768.0, sample_rate)
+
+    # ---- views for the individual libraries --------------------------- #
+    def pcm16(self) -> np.ndarray:
+        return (np.clip(self.samples, -1.0, 1.0) * 32767).astype("<i2")
+
+    def to_segment(self):
+        from pydub import AudioSegment
+        return AudioSegment(self.pcm16().tobytes(), frame_rate=self.sample_rate,
+                            sample_width=2, channels=1)
+
+    def to_sound(self):
+        import parselmouth
+        return parselmouth.Sound(self.samples.astype(np.float64),
+                                 sampling_frequency=self.sample_rate)
+
+    def write(self, path: Path) -> Path:
+        """Persist as 16-bit PCM WAV (only when a file is really needed)."""
+        with wave.open(str(path), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(self.pcm16().tobytes())
+        return Path(path)
+
+
+AudioLike = Union[AudioBuffer, Path, str]
+
+
+def as_buffer(audio: AudioLike) -> AudioBuffer:
+    """Accept either a decoded buffer or a path (decoded here, once)."""
+    return audio if isinstance(audio, AudioBuffer) else AudioBuffer.from_file(audio)
+
+
+def probe_duration(path: Path | str) -> float:
+    """Length in seconds without decoding (WAV header, else ffprobe)."""
+    try:
+        with wave.open(str(path)) as wf:
+            return wf.getnframes() / wf.getframerate()
+    except (wave.Error, EOFError):
+        from pydub.utils import mediainfo
+        return float(mediainfo(str(path)).get("duration", 0.0))
+
+
+def iter_pcm(path: Path | str, sample_rate: int = SAMPLE_RATE,
+             block_s: float = 10.0) -> Iterator[np.ndarray]:
+    """Decode any ffmpeg-readable file as mono float32 blocks of `block_s`.
+
+    ffmpeg writes s16le to a pipe, so memory is one block however long the
+    recording is.
+    """
+    cmd = ["ffmpeg", "-nostdin", "-v", "error", "-i", str(path),
+           "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-"]
+    block = int(block_s * sample_rate) * 2
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+        while data := proc.stdout.read(block):
+            yield np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+        err = proc.stderr.read().decode(errors="replace").strip()
+    if proc.returncode:
+        raise RuntimeError(f"ffmpeg failed to decode {path}: {err}")
+
+
+def wav_header(sample_rate: int, data_bytes: int | None = None,
+               channels: int = 1, bits: int = 16) -> bytes:
+    """RIFF/WAVE header for PCM; `data_bytes=None` marks an open-ended stream."""
+    size = 0xFFFFFFFF if data_bytes is None else data_bytes
+    riff = 0xFFFFFFFF if data_bytes is None else 36 + data_bytes
+    block = channels * bits // 8
+    return (b"RIFF" + struct.pack("<I", riff) + b"WAVE"
+            + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate,
+                                    sample_rate * block, block, bits)
+            + b"data" + struct.pack("<I", size))
@@ -0,0 +1,140 @@
+"""
+Content-addressed disk cache
+----------------------------
+• key(audio_sha256, **config)           -> entry key
+• memo_json(key, name, fn)              -> cached JSON value, computed on a miss
+• memo_file(key, name, fn)              -> cached file path, fn(dest) writes it
+
+Each key is one directory holding any number of named artefacts.  The
+directory mtime is bumped on every hit, and the least-recently-used
+directories are evicted once the cache grows past `max_bytes`.
+"""
+
+from __future__ import annotations
+import hashlib, json, os, shutil, threading
+from pathlib import Path
+from typing import Any, Callable
+
+from app.config import RESULT_CACHE_DIR, RESULT_CACHE_MAX_MB
+
+CACHE_VERSION = 6      # bump to invalidate every entry at once
+
+
+class DiskCache:
+    def __init__(self, root: Path, max_bytes: int, low_water: float = 0.8) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self._size: int | None = None          # lazily scanned running total
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def key(audio_sha256: str, **config: Any) -> str:
+        """Hash of the audio bytes + everything that influences the result."""
+        blob = json.dumps({"v": CACHE_VERSION, "audio": audio_sha256, **config},
+                          sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def path(self, key: str, name: str) -> Path:
+        d = self._dir(key)
+        d.mkdir(parents=True, exist_ok=True)
+        return d / name
+
+    def _touch(self, key: str) -> None:
+        try:
+            os.utime(self._dir(key))
+        except FileNotFoundError:
+            pass
+
+    # ------------------------------------------------------------------ #
+    def get_json(self, key: str, name: str) -> Any | None:
+        f = self._dir(key) / f"{name}.json"
+        try:
+            value = json.loads(f.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        self._touch(key)
+        return value
+
+    def put_json(self, key: str, name: str, value: Any) -> None:
+        dest = self.path(key, f"{name}.json")
+        tmp  = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}")
+        tmp.write_text(json.dumps(value, default=float))
+        os.replace(tmp, dest)
+        self._added(dest.stat().st_size)
+
+    def get_file(self, key: str, name: str) -> Path | None:
+        f = self._dir(key) / name
+        if not f.exists():
+            return None
+        self._touch(key)
+        return f
+
+    def memo_json(self, key: str, name: str, fn: Callable[[], Any]) -> Any:
+        value = self.get_json(key, name)
+        if value is None:
+            value = fn()
+            self.put_json(key, name, value)
+        return value
+
+    def memo_file(self, key: str, name: str, fn: Callable[[Path], Any]) -> Path:
+        """`fn(dest)` must write the artefact to `dest`."""
+        cached = self.get_file(key, name)
+        if cached is not None:
+            return cached
+        dest = self.path(key, name)
+        tmp  = dest.with_name(f".{os.getpid()}.{threading.get_ident()}.{name}")
+        fn(tmp)
+        os.replace(tmp, dest)
+        self._added(dest.stat().st_size)
+        return dest
+
+    # ------------------------------------------------------------------ #
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for d in self.root.glob("*/*"):
+            if d.is_dir():
+                size = sum(f.stat().st_size for f in d.iterdir() if f.is_file())
+                entries.append((d.stat().st_mtime, size, d))
+        return entries
+
+    def _added(self, nbytes: int) -> None:
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += nbytes
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # rescan: other workers share the directory, so our running total drifts
+        entries = sorted(self._scan())                 # oldest mtime first
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * self.low_water
+        for _, size, d in entries:
+            if total <= target:
+                break
+            shutil.rmtree(d, ignore_errors=True)
+            total -= size
+        self._size = total
+
+    def clear(self) -> None:
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self._size = 0
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+result_cache = DiskCache(RESULT_CACHE_DIR, RESULT_CACHE_MAX_MB * 2**20)
@@ -0,0 +1,310 @@
+"""
+In-process job queue
+--------------------
+• submit(fn, *args, priority=0, **kw) -> Job   (raises JobQueueFull when saturated)
+• get(job_id)              -> dict | None  (status, stage, progress, result)
+• cancel(job_id)           -> bool         (queued: dropped; running: stops at next progress())
+                                            raises JobNotOwned for another process's job
+• events(job_id)           -> async iterator of state snapshots (for SSE)
+
+A bounded pool of worker threads runs the jobs, lowest `priority` first
+(FIFO within a priority).  `fn` receives a `progress(stage, fraction)`
+keyword so long pipelines can report where they are; it is also the
+cancellation point – once a job is cancelled, its next progress() call
+raises JobCancelled.  With `db_path` job state is mirrored to SQLite, so any worker
+process sharing the file can answer polls – no external broker needed.
+`maxsize` bounds the jobs still queued; cancelling one frees its slot.
+
+Every row records its owner (host:pid) and a heartbeat that the owning
+process refreshes every HEARTBEAT_S.  Unfinished rows are only failed as
+"interrupted" once their owner is gone – a dead pid on this host, or no
+heartbeat for STALE_AFTER_S – so starting another worker never touches
+jobs that live workers are running.  Finished rows are pruned to `keep`.
+"""
+
+from __future__ import annotations
+import asyncio, itertools, json, math, os, queue, socket, sqlite3, threading, time, traceback, uuid
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+
+TERMINAL = {"done", "failed", "cancelled"}
+HEARTBEAT_S   = 10.0
+STALE_AFTER_S = 60.0
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by submit() when the backlog is at capacity."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job by progress() once cancel() was called."""
+
+
+class JobNotOwned(LookupError):
+    """Raised by cancel() for an unfinished job that another worker process runs."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str = "queued"            # queued → running → done | failed | cancelled
+    stage: str = "queued"
+    progress: float = 0.0
+    priority: int = 0
+    cancel_requested: bool = False
+    result: Any = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _owner_alive(owner: str | None) -> bool | None:
+    """True/False for an owner on this host, None when it can't be checked from here."""
+    host, _, pid = (owner or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return None
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:                    # exists, owned by another user
+        pass
+    return True
+
+
+class _SQLiteJobs:
+    """Tiny write-through mirror of Job rows; `updated` doubles as the heartbeat."""
+
+    _UNFINISHED = "(status IS NULL OR status NOT IN ('done', 'failed', 'cancelled'))"
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self._local = threading.local()
+        with self._conn() as c:
+            c.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                           id TEXT PRIMARY KEY, body TEXT NOT NULL, updated REAL NOT NULL,
+                           status TEXT, owner TEXT)""")
+            columns = {row[1] for row in c.execute("PRAGMA table_info(jobs)")}
+            for col in ("status", "owner"):        # tables created before owners were tracked
+                if col not in columns:
+                    c.execute(f"ALTER TABLE jobs ADD COLUMN {col} TEXT")
+            c.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, updated)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def save(self, job: Job) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO jobs (id, body, updated, status, owner) VALUES (?, ?, ?, ?, ?)",
+            (job.id, json.dumps(job.to_dict(), default=str), time.time(), job.status, OWNER))
+
+    def heartbeat(self) -> None:
+        self._conn().execute(f"UPDATE jobs SET updated = ? WHERE owner = ? AND {self._UNFINISHED}",
+                             (time.time(), OWNER))
+
+    def load(self, job_id: str) -> dict | None:
+        row = self._conn().execute("SELECT body FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def owner(self, job_id: str) -> str | None:
+        """host:pid running an unfinished job; None if unknown or finished."""
+        row = self._conn().execute(f"SELECT owner FROM jobs WHERE id = ? AND {self._UNFINISHED}",
+                                   (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def mark_interrupted(self, stale_after_s: float = STALE_AFTER_S) -> None:
+        # jobs whose owning process died will never finish; live owners keep theirs
+        rows = self._conn().execute(
+            f"SELECT id, body, updated, owner FROM jobs WHERE {self._UNFINISHED}").fetchall()
+        now = time.time()
+        for job_id, body, updated, owner in rows:
+            if owner == OWNER:
+                continue
+            alive = _owner_alive(owner)
+            if alive is False or (alive is None and now - updated > stale_after_s):
+                job = json.loads(body)
+                job.update(status="failed", error="interrupted: worker process is gone",
+                           finished_at=now)
+                self._conn().execute("UPDATE jobs SET body = ?, status = ?, updated = ? WHERE id = ?",
+                                     (json.dumps(job), "failed", now, job_id))
+
+    def prune(self, keep: int) -> None:
+        """Keep only the `keep` most recently finished rows."""
+        self._conn().execute(
+            f"""DELETE FROM jobs WHERE NOT {self._UNFINISHED} AND id NOT IN (
+                  SELECT id FROM jobs WHERE NOT {self._UNFINISHED} ORDER BY updated DESC LIMIT ?)""",
+            (keep,))
+
+
+class JobQueue:
+    def __init__(self, workers: int = 2, maxsize: int = 16,
+                 db_path: Path | None = None, name: str = "jobs",
+                 keep: int = 1000) -> None:
+        self.name = name
+        self.workers = workers
+        self.maxsize = maxsize
+        self.keep = keep
+        # unbounded: capacity is `_queued` (cancelled jobs leave it, their items stay)
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._queued = 0
+        self._seq = itertools.count()          # FIFO tie-break; payloads are never compared
+        self._jobs: dict[str, Job] = {}
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._db = _SQLiteJobs(db_path) if db_path else None
+        self._stop = threading.Event()
+        if self._db:
+            self._db.mark_interrupted()
+            self._db.prune(keep)
+
+    # ------------------------------------------------------------------ #
+    def _start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+            if self._db:
+                t = threading.Thread(target=self._heartbeat, name=f"{self.name}-heartbeat", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(HEARTBEAT_S):
+            try:
+                self._db.heartbeat()
+                self._db.mark_interrupted()            # also catches workers that crashed since
+                self._db.prune(self.keep)
+            except sqlite3.Error:
+                print(traceback.format_exc())
+
+    def _update(self, job: Job, **changes: Any) -> None:
+        for k, v in changes.items():
+            setattr(job, k, v)
+        if self._db:
+            self._db.save(job)
+
+    def _work(self) -> None:
+        while True:
+            _, _, item = self._queue.get()
+            if item is None:                       # shutdown sentinel
+                return
+            job, fn, args, kwargs = item
+
+            def progress(stage: str, fraction: float | None = None, _job=job) -> None:
+                if _job.cancel_requested:
+                    raise JobCancelled(_job.id)
+                self._update(_job, stage=stage,
+                             progress=_job.progress if fraction is None else float(fraction))
+
+            with self._lock:
+                if job.status == "cancelled":      # cancelled while still queued
+                    self._queue.task_done()
+                    continue
+                self._queued -= 1
+                self._update(job, status="running", stage="started", started_at=time.time())
+            try:
+                result = fn(*args, progress=progress, **kwargs)
+                self._update(job, status="done", stage="done", progress=1.0,
+                             result=result, finished_at=time.time())
+            except JobCancelled:
+                self._update(job, status="cancelled", stage="cancelled", finished_at=time.time())
+            except Exception as err:
+                print(traceback.format_exc())
+                self._update(job, status="failed", error=str(err), finished_at=time.time())
+            finally:
+                self._queue.task_done()
+
+    def _forget_old(self) -> None:
+        if len(self._jobs) <= self.keep:
+            return
+        finished = sorted((j for j in self._jobs.values() if j.status in TERMINAL),
+                          key=lambda j: j.finished_at or 0)
+        for j in finished[: len(self._jobs) - self.keep]:
+            self._jobs.pop(j.id, None)
+
+    # ------------------------------------------------------------------ #
+    def submit(self, fn: Callable[..., Any], *args: Any,
+               kind: str = "job", priority: int = 0, **kwargs: Any) -> Job:
+        self._start()
+        job = Job(id=uuid.uuid4().hex, kind=kind, priority=priority)
+        with self._lock:
+            full = self.maxsize > 0 and self._queued >= self.maxsize
+            if not full:
+                self._queued += 1
+                self._jobs[job.id] = job
+                self._forget_old()
+        if full:
+            self._update(job, status="failed", error="rejected: queue full")
+            raise JobQueueFull(f"{self.name} queue is full ({self.maxsize} pending)")
+        self._update(job)
+        self._queue.put_nowait((priority, next(self._seq), (job, fn, args, kwargs)))
+        return job
+
+    def get(self, job_id: str) -> dict | None:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self._db.load(job_id) if self._db else None
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job of this process; False if it already finished.
+
+        Only the owning process can stop a job, so an unfinished job of another
+        worker raises JobNotOwned.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                owner = self._db.owner(job_id) if self._db else None
+                if owner is not None:
+                    raise JobNotOwned(f"Job '{job_id}' runs in worker {owner}, not this one ({OWNER})")
+                return False
+            if job.status in TERMINAL:
+                return False
+            job.cancel_requested = True
+            if job.status == "queued":
+                self._queued -= 1                  # its slot is free now; the worker skips the item
+                self._update(job, status="cancelled", stage="cancelled", finished_at=time.time())
+        return True
+
+    async def events(self, job_id: str, interval: float = 0.25) -> AsyncIterator[dict]:
+        """Yield a snapshot every time the job's stage/progress/status changes."""
+        last = None
+        while True:
+            snap = self.get(job_id)
+            if snap is None:
+                return
+            marker = (snap["status"], snap["stage"], snap["progress"])
+            if marker != last:
+                last = marker
+                yield snap
+            if snap["status"] in TERMINAL:
+                return
+            await asyncio.sleep(interval)
+
+    def pending(self) -> int:
+        return self._queued
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        for _ in range(self.workers if self._threads else 0):
+            self._queue.put_nowait((math.inf, next(self._seq), None))   # unbounded: never blocks
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads.clear()
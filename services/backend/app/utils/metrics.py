@@ -0,0 +1,78 @@
+"""
+In-process metrics
+------------------
+• metrics.observe(name, value)  -> rolling histogram (p50 / p90 / p99)
+• metrics.mark(name, n)         -> events per second over a sliding window
+• metrics.snapshot()            -> plain dict, served on GET /metrics
+
+Deliberately tiny: bounded memory per series, no exporter dependency.
+"""
+
+from __future__ import annotations
+import threading, time
+from collections import deque
+
+import numpy as np
+
+
+class Histogram:
+    def __init__(self, window: int = 2048) -> None:
+        self.values: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.values.append(value)
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> dict:
+        if not self.values:
+            return {"count": 0}
+        v = np.fromiter(self.values, dtype=float)
+        p50, p90, p99 = np.percentile(v, [50, 90, 99])
+        return {"count": self.count, "mean": self.total / self.count,
+                "p50": p50, "p90": p90, "p99": p99, "max": float(v.max())}
+
+
+class Rate:
+    def __init__(self, window_s: float = 60.0) -> None:
+        self.window_s = window_s
+        self.events: deque[tuple[float, int]] = deque()
+        self.total = 0
+
+    def mark(self, n: int = 1) -> None:
+        now = time.monotonic()
+        self.events.append((now, n))
+        self.total += n
+        while self.events and self.events[0][0] < now - self.window_s:
+            self.events.popleft()
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        recent = sum(n for t, n in self.events if t >= now - self.window_s)
+        return {"total": self.total, "per_s": recent / self.window_s}
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self._hist: dict[str, Histogram] = {}
+        self._rate: dict[str, Rate] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self._hist.setdefault(name, Histogram()).observe(value)
+
+    def mark(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._rate.setdefault(name, Rate()).mark(n)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {name: h.snapshot() for name, h in self._hist.items()}
+            out |= {name: r.snapshot() for name, r in self._rate.items()}
+        return dict(sorted(out.items()))
+
+
+metrics = Metrics()
@@ -0,0 +1,66 @@
+"""
+Mergeable quantile sketch
+-------------------------
+LogHistogram counts values in fixed log-spaced bins over [lo, hi].  Two
+sketches with the same bins merge by adding their counts, so a statistic
+over a long recording can be assembled from per-window sketches without
+keeping (or re-reading) the raw values.
+
+    h = LogHistogram(75, 500)        # 1 cent bins → ~0.06 % relative error
+    h.add(f0_window_1); h.merge(other_window)
+    h.mean(), h.quantile(0.75) - h.quantile(0.25)
+
+count / sum / min / max are tracked exactly; quantiles are interpolated
+within a bin.  Values outside [lo, hi] land in the edge bins.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+class LogHistogram:
+    def __init__(self, lo: float, hi: float, bins_per_octave: int = 1200) -> None:
+        self.lo, self.hi = float(lo), float(hi)
+        self.bins_per_octave = bins_per_octave
+        self.counts = np.zeros(int(np.ceil(np.log2(hi / lo) * bins_per_octave)), dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if not values.size:
+            return
+        idx = np.floor(np.log2(np.clip(values, self.lo, self.hi) / self.lo) * self.bins_per_octave)
+        np.add.at(self.counts, np.clip(idx.astype(np.int64), 0, len(self.counts) - 1), 1)
+        self.count += values.size
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        if (other.lo, other.hi, other.bins_per_octave) != (self.lo, self.hi, self.bins_per_octave):
+            raise ValueError("Cannot merge LogHistograms with different bins")
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float("nan")
+
+    def quantile(self, q: float) -> float:
+        """≈ np.percentile(values, 100 * q) (linear interpolation between ranks)."""
+        if not self.count:
+            return float("nan")
+        rank = q * (self.count - 1)
+        cum = np.cumsum(self.counts)
+        i = int(np.searchsorted(cum, rank, side="right"))
+        below = cum[i - 1] if i else 0
+        frac = min((rank - below + 0.5) / self.counts[i], 1.0)   # position inside bin i
+        value = self.lo * 2 ** ((i + frac) / self.bins_per_octave)
+        return float(np.clip(value, self.min, self.max))
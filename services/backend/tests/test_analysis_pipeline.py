@@ -0,0 +1,43 @@
+import threading, time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.speech_compare import analysis_pipeline
+from app.utils.audio import AudioBuffer
+from app.utils.jobs import JobQueue
+
+
+def test_cancel_running_job_ends_cancelled(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    metrics = {"duration_s": 2.0, "mean_pitch_Hz": 120.0, "wpm": 100.0}
+
+    def fake_run_stages(stages, progress):
+        started.set()
+        release.wait(5)
+        return SimpleNamespace(results={"metrics": metrics, "persona": metrics})
+
+    def no_coach(name):
+        raise AssertionError("a cancelled job must stop before coaching")
+
+    monkeypatch.setattr(analysis_pipeline, "run_stages", fake_run_stages)
+    monkeypatch.setattr(analysis_pipeline, "get_coach", no_coach)
+
+    jobs = JobQueue(workers=1, name="test")
+    try:
+        job = jobs.submit(analysis_pipeline.run_pipeline, AudioBuffer(np.zeros(16000, np.float32)),
+                          Path("persona.wav"), "fake", "run")
+        assert started.wait(5)
+        assert jobs.get(job.id)["status"] == "running"
+        assert jobs.cancel(job.id)
+        release.set()
+        deadline = time.time() + 5
+        while jobs.get(job.id)["status"] == "running" and time.time() < deadline:
+            time.sleep(0.01)
+        snap = jobs.get(job.id)
+        assert snap["status"] == "cancelled"
+        assert snap["error"] is None
+    finally:
+        release.set()
+        jobs.shutdown()
@@ -0,0 +1,10 @@
+from app.speech_compare.compare import diff, top_gaps, RATE_VARIANTS
+
+
+def test_top_gaps_skips_rate_variants():
+    user = {"wpm": 150.0, "ttr": 0.9, "hedge_pct": 0.2, "jitter_local": 0.02,
+            **{k: 400.0 for k in RATE_VARIANTS}}
+    persona = {"wpm": 120.0, "ttr": 0.5, "hedge_pct": 0.1, "jitter_local": 0.01,
+               **{k: 100.0 for k in RATE_VARIANTS}}
+    gaps = top_gaps(diff(user, persona))
+    assert list(gaps) == ["wpm", "ttr", "hedge_pct"]
@@ -0,0 +1,78 @@
+import functools, importlib.util, shutil, threading, wave
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[3] / "scripts" / "fetch_personas.py"
+spec = importlib.util.spec_from_file_location("fetch_personas", SCRIPT)
+fetch_personas = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fetch_personas)
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not on PATH")
+
+
+def _write_wav(path: Path, seconds: float, rate: int = 44100, channels: int = 2) -> None:
+    t = np.arange(int(seconds * rate)) / rate
+    tone = (np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.repeat(tone, channels).tobytes())
+
+
+@pytest.fixture
+def media(tmp_path):
+    src = tmp_path / "media"
+    src.mkdir()
+    _write_wav(src / "talk.wav", 4.0)
+    return src
+
+
+@pytest.fixture
+def http_media(media):
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=str(media))
+    handler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _fetch(url: str, out: Path) -> dict:
+    [row] = fetch_personas.fetch_all([{"id": "p", "url": url, "start": "00:00:01"}], out, duration=2)
+    return row
+
+
+@needs_ffmpeg
+@pytest.mark.parametrize("as_url", [False, True])
+def test_fetch_from_local_dir(media, tmp_path, as_url):
+    src = media / "talk.wav"
+    row = _fetch(src.as_uri() if as_url else str(src), tmp_path / "out")
+    assert row["status"] == "fetched"
+    assert fetch_personas.is_valid_clip(tmp_path / "out" / "p.wav", 2)
+
+
+@needs_ffmpeg
+def test_fetch_from_http_server(http_media, tmp_path):
+    row = _fetch(f"{http_media}/talk.wav", tmp_path / "out")
+    assert row["status"] == "fetched"
+    assert fetch_personas.is_valid_clip(tmp_path / "out" / "p.wav", 2)
+    assert _fetch(f"{http_media}/talk.wav", tmp_path / "out")["status"] == "skipped"
+
+
+def test_valid_clip_is_skipped(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    _write_wav(out / "p.wav", 2.0, rate=fetch_personas.SAMPLE_RATE, channels=1)
+    assert _fetch("https://example.com/never-fetched.mp3", out)["status"] == "skipped"
+
+
+def test_schemeless_url_is_rejected(tmp_path):
+    row = _fetch("example.com/talk.mp3", tmp_path / "out")
+    assert row["status"] == "failed"
+    assert "no scheme" in row["error"]
+    assert not (tmp_path / "out" / "p.wav").exists()
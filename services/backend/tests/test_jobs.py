@@ -0,0 +1,105 @@
+import json, socket, sqlite3, subprocess, sys, threading, time
+
+import pytest
+
+from app.utils import jobs as jobs_mod
+from app.utils.jobs import Job, JobNotOwned, JobQueue, JobQueueFull
+
+
+@pytest.fixture
+def blocked():
+    """A queue whose single worker is busy until `release` is set."""
+    started, release = threading.Event(), threading.Event()
+    queues = []
+
+    def make(**kw):
+        q = JobQueue(workers=1, name="test", **kw)
+        queues.append(q)
+        q.submit(lambda progress: (started.set(), release.wait(5)))
+        assert started.wait(5)
+        return q
+
+    yield make, release
+    release.set()
+    for q in queues:
+        q.shutdown()
+
+
+def _wait_done(q, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while q.get(job_id)["status"] not in jobs_mod.TERMINAL and time.time() < deadline:
+        time.sleep(0.01)
+    return q.get(job_id)
+
+
+def test_cancelled_queued_job_frees_its_slot(blocked):
+    make, release = blocked
+    q = make(maxsize=1)
+    queued = q.submit(lambda progress: "a")
+    with pytest.raises(JobQueueFull):
+        q.submit(lambda progress: "b")
+    assert q.cancel(queued.id)
+    assert q.pending() == 0
+    later = q.submit(lambda progress: "b")
+    release.set()
+    assert _wait_done(q, later.id)["result"] == "b"
+    assert q.get(queued.id)["status"] == "cancelled"
+
+
+def test_lower_priority_runs_first(blocked):
+    make, release = blocked
+    q = make()
+    order = []
+    bulk = q.submit(lambda progress: order.append("bulk"), priority=5)
+    first = q.submit(lambda progress: order.append("first"), priority=0)
+    second = q.submit(lambda progress: order.append("second"), priority=0)
+    release.set()
+    for job in (bulk, first, second):
+        _wait_done(q, job.id)
+    assert order == ["first", "second", "bulk"]
+
+
+def test_heartbeat_refreshes_running_rows(blocked, tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs_mod, "HEARTBEAT_S", 0.02)
+    make, release = blocked
+    db = tmp_path / "jobs.db"
+    make(db_path=db)
+
+    def updated():
+        with sqlite3.connect(db) as c:
+            return c.execute("SELECT updated FROM jobs WHERE status = 'running'").fetchone()[0]
+
+    before = updated()
+    time.sleep(0.2)
+    assert updated() > before
+
+
+def _row(db, owner, updated, status="running"):
+    job = Job(id=f"job-{owner}", kind="analyze", status=status)
+    with sqlite3.connect(db) as c:
+        c.execute("INSERT INTO jobs (id, body, updated, status, owner) VALUES (?, ?, ?, ?, ?)",
+                  (job.id, json.dumps(job.to_dict()), updated, status, owner))
+    return job.id
+
+
+def test_interrupted_jobs_are_recovered(tmp_path):
+    db = tmp_path / "jobs.db"
+    jobs_mod._SQLiteJobs(db)                                  # create the table
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    host = socket.gethostname()
+    dead = _row(db, f"{host}:{proc.pid}", time.time())        # pid is gone
+    stale = _row(db, "elsewhere:1", time.time() - 3600)        # no heartbeat for an hour
+    live = _row(db, "elsewhere:2", time.time())                # another host, still beating
+
+    q = JobQueue(db_path=db, name="test")
+    try:
+        for job_id in (dead, stale):
+            snap = q.get(job_id)
+            assert snap["status"] == "failed" and snap["error"].startswith("interrupted")
+        assert q.get(live)["status"] == "running"
+        with pytest.raises(JobNotOwned):
+            q.cancel(live)
+        assert q.cancel(dead) is False                        # finished: nothing to cancel
+    finally:
+        q.shutdown()
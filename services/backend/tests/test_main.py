@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.speech_compare import main
+from app.utils.audio import AudioBuffer
+
+
+def test_run_smoke(tmp_path, monkeypatch):
+    """The single-clip CLI path end to end, with models and I/O stubbed out."""
+    clips = {"user.wav": 140.0, "persona.wav": 110.0}
+    written = {}
+
+    class FakeTranscriber:
+        def transcribe(self, audio):
+            return {"segments": [{"start": 0.0, "end": 2.0, "text": "just a test"}]}
+
+    class FakeCoach:
+        def advise(self, gaps):
+            written["gaps"] = gaps
+            return ["tip"]
+
+    monkeypatch.setattr(main, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(main, "load_clean",
+                        lambda p: AudioBuffer(np.zeros(16000, np.float32), meta={"pitch": clips[p.name]}))
+    monkeypatch.setattr(main, "get_transcriber", lambda: FakeTranscriber())
+    monkeypatch.setattr(main, "prosody_metrics", lambda a: {
+        "duration_s": 2.0, "mean_pitch_Hz": a.meta["pitch"], "pitch_IQR_Hz": a.meta["pitch"] / 4,
+        "jitter_local": 0.01, "shimmer_local": 0.05})
+    monkeypatch.setattr(main, "language_metrics", lambda text, d: {"wpm": 90.0, "hedge_pct": 0.3, "ttr": 1.0})
+    monkeypatch.setattr(main, "get_coach", lambda name: FakeCoach())
+    monkeypatch.setattr(main, "render", lambda df, tips, out_name: written.update(df=df, tips=tips))
+
+    main.run(tmp_path / "user.wav", tmp_path / "persona.wav", coach="fake")
+
+    assert list(written["df"].columns) == ["user", "persona"]
+    assert written["tips"] == ["tip"]
+    assert "mean_pitch_Hz" in written["gaps"]
+    assert (tmp_path / "user.json").exists() and (tmp_path / "persona.json").exists()
@@ -0,0 +1,39 @@
+import json, threading
+
+import numpy as np
+
+from app.ml.persona_store import META_JSON, STORE_NAME, open_store, write_store
+
+
+def _meta(tmp_path, n=3):
+    meta = {f"p{i}": {"embedding": [float(i + 1), 1.0], "prosody": {"mean_pitch": 100.0 + i, "wpm": 150.0}}
+            for i in range(n)}
+    (tmp_path / META_JSON).write_text(json.dumps(meta))
+
+
+def test_concurrent_open_converts_once(tmp_path):
+    _meta(tmp_path)
+    stores, barrier = [], threading.Barrier(4)
+
+    def worker():
+        barrier.wait()
+        stores.append(open_store(tmp_path))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(list((tmp_path / STORE_NAME).glob("gen-*"))) == 1
+    assert {s.directory for s in stores} == {stores[0].directory}
+
+
+def test_open_store_survives_pruning(tmp_path):
+    _meta(tmp_path)
+    store = open_store(tmp_path)                      # not queried before the builds below
+    for _ in range(3):                                # prunes the generation `store` came from
+        write_store(tmp_path / STORE_NAME, ["x"], np.ones((1, 2)), [{"mean_pitch": 1.0, "wpm": 1.0}])
+    assert not store.directory.exists()
+    emb, prosody = store.get("p1")
+    assert np.allclose(emb, np.array([2.0, 1.0]) / np.sqrt(5))
+    assert prosody == {"mean_pitch": 101.0, "wpm": 150.0}
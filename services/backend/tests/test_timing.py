@@ -0,0 +1,28 @@
+import pytest
+
+from app.speech_compare.timing import timing_metrics
+
+KEPT = [(0.0, 2.0), (5.0, 7.0)]          # 3 s of silence cut at clean t=2
+
+
+def test_word_ending_on_a_cut_keeps_the_pause():
+    segments = [{"start": 0.0, "end": 4.0, "text": "one two three four"}]   # 1 s per word
+    m = timing_metrics(segments, KEPT)
+    assert m["gap_count"] == 1
+    assert m["gap_max_s"] == pytest.approx(3.0)
+
+
+def test_word_straddling_a_cut_is_split():
+    segments = [{"start": 0.0, "end": 4.0, "text": "one two three"}]        # "two" spans t=2
+    m = timing_metrics(segments, KEPT)
+    assert m["gap_count"] == 1
+    assert m["gap_max_s"] == pytest.approx(3.0)
+    assert m["articulation_wpm"] == pytest.approx(3 / 4 * 60)
+
+
+def test_aligned_words_unchanged():
+    segments = [{"start": 0.0, "end": 4.0, "text": "a b",
+                 "words": [{"word": "a", "start": 0.5, "end": 1.5}, {"word": "b", "start": 2.5, "end": 3.5}]}]
+    m = timing_metrics(segments, KEPT)
+    assert m["gap_max_s"] == pytest.approx(4.0)     # 1.5 → 5.5 on the source timeline
+    assert m["speech_rate_wpm"] == pytest.approx(2 / 6 * 60)
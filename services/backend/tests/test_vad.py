@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from app.speech_compare.vad import trim_silence
+
+pydub = pytest.importorskip("pydub")
+from pydub.silence import split_on_silence  # noqa: E402
+
+SR = 16_000
+
+
+def _clip(rng: np.random.Generator) -> np.ndarray:
+    """Tone bursts and near-silent gaps, ending anywhere – not on a whole ms."""
+    parts = []
+    for _ in range(rng.integers(2, 6)):
+        n = int(rng.uniform(0.1, 0.8) * SR)
+        parts.append(8000 * np.sin(2 * np.pi * rng.uniform(100, 300) * np.arange(n) / SR))
+        parts.append(rng.normal(0, 3, int(rng.uniform(0.05, 0.9) * SR)))
+    pcm = np.concatenate(parts)[: -int(rng.integers(1, SR // 1000))]   # drop a partial ms
+    return np.round(pcm).astype("<i2")
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_trim_matches_pydub(seed):
+    pcm = _clip(np.random.default_rng(seed))
+    seg = pydub.AudioSegment(pcm.tobytes(), frame_rate=SR, sample_width=2, channels=1)
+    chunks = split_on_silence(seg, min_silence_len=250, silence_thresh=-40, keep_silence=100)
+    expected = np.concatenate([np.frombuffer(c.raw_data, "<i2") for c in chunks]) if chunks else []
+
+    got = trim_silence(pcm.astype(np.float32) / 32768, SR, 0.25, -40, keep_silence_ms=100)
+    np.testing.assert_array_equal(np.round(got.samples * 32768).astype("<i2"), expected)
+    assert len(got.pauses) == max(len(chunks) - 1, 0)